@@ -1,12 +1,60 @@
+import atexit
+import contextvars
+import copy
+import functools
 import json
+import queue
 import re
 import os
-from datetime import datetime
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, Dict, List, Tuple, Optional, Mapping
+from typing import Any, Callable, Dict, List, Tuple, Optional, Mapping, Sequence
 
+from openai import APIConnectionError, APITimeoutError, BadRequestError, RateLimitError
+
+from ai_summary.llm_cache import JsonSchemaCache, get_llm_cache
 from ai_summary.openai_client import get_openai_client
 
+try:
+    # optional: pyahocorasick (multi-pattern figure-ref checks)
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    # optional: orjson (faster payload encoding / reply parsing)
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # optional: fastjsonschema (compiled validators for model replies)
+    import fastjsonschema
+except ImportError:
+    fastjsonschema = None
+
+try:
+    # optional: jsonschema (slower validator, used when fastjsonschema is missing)
+    import jsonschema
+except ImportError:
+    jsonschema = None
+
+
+def _json_dumps(obj: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def _json_loads(txt: str) -> Any:
+    if orjson is not None:
+        return orjson.loads(txt)
+    return json.loads(txt)
+
 
 # -----------------------------
 # Debug logging (enable with SUMMARY_DEBUG=1)
@@ -14,8 +62,23 @@ from ai_summary.openai_client import get_openai_client
 _SUMMARY_DEBUG = os.getenv("SUMMARY_DEBUG", "").strip().lower() in {"1", "true", "yes", "y", "on"}
 _DBG_MAX_CONSOLE_CHARS = int(os.getenv("SUMMARY_DEBUG_MAX_CHARS", "8000"))  # console safety
 _DBG_DIR = Path(os.getenv("SUMMARY_DEBUG_DIR", "/tmp/brain_worm_llm_logs"))
-_DBG_DIR.mkdir(parents=True, exist_ok=True)
+if _SUMMARY_DEBUG:
+    _DBG_DIR.mkdir(parents=True, exist_ok=True)
 _DBG_CALL_ID = 0
+_DBG_LOCK = threading.Lock()
+
+# Stream JSON calls (SUMMARY_STREAM=0 to disable): text is accumulated while the model
+# is still generating, and the 60 s timeout applies per read instead of to the whole reply.
+_STREAM_RESPONSES = os.getenv("SUMMARY_STREAM", "1").strip().lower() in {"1", "true", "yes", "y", "on"}
+
+
+_UNSAFE_NAME_RE = re.compile(r"[^a-zA-Z0-9_.-]+")
+
+
+@functools.lru_cache(maxsize=64)
+def _safe_name(value: str, max_len: int) -> str:
+    # kinds/models repeat on every call: sanitize each distinct value once
+    return _UNSAFE_NAME_RE.sub("_", value)[:max_len]
 
 
 def _dbg_print(msg: str) -> None:
@@ -23,31 +86,77 @@ def _dbg_print(msg: str) -> None:
         print(msg)
 
 
+# Debug files are written by one background thread, so concurrent MAP workers never
+# wait on the filesystem; if the writer falls behind, entries are dropped, not waited for.
+_DBG_QUEUE: "queue.Queue[Tuple[Path, bytes]]" = queue.Queue(maxsize=1024)
+_DBG_WRITER: Optional[threading.Thread] = None
+
+
+def _dbg_write(path: Path, data: bytes) -> None:
+    try:
+        with open(path, "wb", buffering=1 << 20) as f:
+            f.write(data)
+    except OSError as e:
+        print(f"[LLM-OUT] WARNING: failed to write {path}: {type(e).__name__}: {e}")
+
+
+def _dbg_writer_loop() -> None:
+    while True:
+        path, data = _DBG_QUEUE.get()
+        try:
+            _dbg_write(path, data)
+        finally:
+            _DBG_QUEUE.task_done()
+
+
+def _dbg_flush() -> None:
+    """Wait for queued debug files (registered atexit: the writer is a daemon thread)."""
+    if _DBG_WRITER is not None:
+        _DBG_QUEUE.join()
+
+
+def _dbg_write_async(path: Path, data: bytes) -> None:
+    global _DBG_WRITER
+    if _DBG_WRITER is None:
+        with _DBG_LOCK:
+            if _DBG_WRITER is None:
+                writer = threading.Thread(target=_dbg_writer_loop, name="llm-debug-writer", daemon=True)
+                writer.start()
+                atexit.register(_dbg_flush)
+                _DBG_WRITER = writer
+    try:
+        _DBG_QUEUE.put_nowait((path, data))
+    except queue.Full:
+        print(f"[LLM-OUT] WARNING: debug writer backlog full, dropped {path.name}")
+
+
 def _log_llm_output(kind: str, model: str, text: str) -> None:
     """
     Writes full raw LLM output to /tmp (or SUMMARY_DEBUG_DIR).
     Also prints a truncated version to console if SUMMARY_DEBUG=1.
     """
+    # runs on every reply: with debug off, no counter/lock/timestamp work at all
+    if not _SUMMARY_DEBUG:
+        return
+
     global _DBG_CALL_ID
-    _DBG_CALL_ID += 1
-    call_id = _DBG_CALL_ID
+    with _DBG_LOCK:
+        _DBG_CALL_ID += 1
+        call_id = _DBG_CALL_ID
 
     # Always keep full text in file when debug enabled
-    if _SUMMARY_DEBUG:
-        ts = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-        safe_kind = re.sub(r"[^a-zA-Z0-9_.-]+", "_", kind)[:50]
-        safe_model = re.sub(r"[^a-zA-Z0-9_.-]+", "_", (model or "unknown"))[:60]
-        out_path = _DBG_DIR / f"llm_{ts}_#{call_id}_{safe_kind}_{safe_model}.txt"
-        out_path.write_text(text or "", encoding="utf-8")
-
-        _dbg_print(f"[LLM-OUT] #{call_id} kind={kind} model={model!r} chars={len(text or '')} saved={out_path}")
-
-        # Console output (truncated for safety)
-        t = text or ""
-        if len(t) > _DBG_MAX_CONSOLE_CHARS:
-            _dbg_print(t[:_DBG_MAX_CONSOLE_CHARS] + "\n--- [TRUNCATED] ---\n")
-        else:
-            _dbg_print(t + "\n--- [END] ---\n")
+    ts = time.strftime("%Y%m%d_%H%M%S", time.gmtime())
+    out_path = _DBG_DIR / f"llm_{ts}_#{call_id}_{_safe_name(kind, 50)}_{_safe_name(model or 'unknown', 60)}.txt"
+    _dbg_write_async(out_path, (text or "").encode("utf-8"))
+
+    _dbg_print(f"[LLM-OUT] #{call_id} kind={kind} model={model!r} chars={len(text or '')} saved={out_path}")
+
+    # Console output (truncated for safety)
+    t = text or ""
+    if len(t) > _DBG_MAX_CONSOLE_CHARS:
+        _dbg_print(t[:_DBG_MAX_CONSOLE_CHARS] + "\n--- [TRUNCATED] ---\n")
+    else:
+        _dbg_print(t + "\n--- [END] ---\n")
 
 
 MINI_RESULT_SCHEMA = {
@@ -57,6 +166,16 @@ MINI_RESULT_SCHEMA = {
         "mini_summary": {"type": "string"},
     },
     "required": ["section_title", "mini_summary"],
+    "additionalProperties": False,
+}
+
+MINI_RESULTS_BATCH_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "items": {"type": "array", "items": MINI_RESULT_SCHEMA},
+    },
+    "required": ["items"],
+    "additionalProperties": False,
 }
 
 SUMMARY_SCHEMA = {
@@ -66,12 +185,13 @@ SUMMARY_SCHEMA = {
             "type": "object",
             "properties": {
                 "title": {"type": "string"},
-                "year": {},
+                "year": {"type": ["string", "integer", "null"]},
                 "source_path": {"type": "string"},
                 "model": {"type": "string"},
                 "language": {"type": "string"},
             },
             "required": ["title", "year", "source_path", "model", "language"],
+            "additionalProperties": False,
         },
         "key_points": {"type": "array", "items": {"type": "string"}},
         "introduction": {"type": "string"},
@@ -90,10 +210,12 @@ SUMMARY_SCHEMA = {
                             "summary": {"type": "string"},
                         },
                         "required": ["figure", "summary"],
+                        "additionalProperties": False,
                     },
                 },
             },
             "required": ["narrative", "items"],
+            "additionalProperties": False,
         },
         "abbreviations": {
             "type": "array",
@@ -104,6 +226,7 @@ SUMMARY_SCHEMA = {
                     "expanded": {"type": "string"},
                 },
                 "required": ["abbr", "expanded"],
+                "additionalProperties": False,
             },
         },
     },
@@ -116,6 +239,7 @@ SUMMARY_SCHEMA = {
         "figures",
         "abbreviations",
     ],
+    "additionalProperties": False,
 }
 
 
@@ -126,32 +250,209 @@ FIGURES_CHUNK_SCHEMA = {
         "narrative": {"type": "string"},
     },
     "required": ["chunk_id", "narrative"],
+    "additionalProperties": False,
+}
+
+# Section map-reduce (Introduction/Discussion) and key points
+SECTION_CHUNK_SCHEMA = {
+    "type": "object",
+    "properties": {"mini_summary": {"type": "string"}},
+    "required": ["mini_summary"],
+    "additionalProperties": False,
+}
+
+SECTION_REDUCE_SCHEMA = {
+    "type": "object",
+    "properties": {"text": {"type": "string"}},
+    "required": ["text"],
+    "additionalProperties": False,
 }
 
+KEY_POINTS_SCHEMA = {
+    "type": "object",
+    "properties": {"key_points": {"type": "array", "items": {"type": "string"}}},
+    "required": ["key_points"],
+    "additionalProperties": False,
+}
+
+# Compiled validators keyed by id() of the schema constants above (they live for the
+# whole process, so ids are stable). Compiled lazily on first use: a single-shot run
+# never pays for the MAP-step schemas and vice versa.
+# Validation is diagnostic only: the normalizers downstream tolerate partial output.
+_SCHEMA_VALIDATORS: Dict[int, Callable[[Any], Any]] = {}
+_SCHEMA_VALIDATORS_LOCK = threading.Lock()
+
+
+# exceptions raised by whichever validator backend is installed
+_SCHEMA_ERRORS: Tuple[type, ...] = tuple(
+    exc
+    for exc in (
+        fastjsonschema.JsonSchemaException if fastjsonschema is not None else None,
+        jsonschema.ValidationError if jsonschema is not None else None,
+    )
+    if exc is not None
+)
+
+
+def _get_validator(schema: Dict[str, Any]) -> Optional[Callable[[Any], Any]]:
+    if fastjsonschema is None and jsonschema is None:
+        return None
+    key = id(schema)
+    validator = _SCHEMA_VALIDATORS.get(key)
+    if validator is None:
+        with _SCHEMA_VALIDATORS_LOCK:
+            validator = _SCHEMA_VALIDATORS.get(key)
+            if validator is None:
+                if fastjsonschema is not None:
+                    validator = fastjsonschema.compile(schema)
+                else:
+                    validator = jsonschema.Draft202012Validator(schema).validate
+                _SCHEMA_VALIDATORS[key] = validator
+    return validator
+
 
 # -----------------------------
 # Helpers: hard cap for paid LLM calls (runaway cost protection)
 # -----------------------------
-_LLM_CALL_LIMITER = None  # type: Optional[callable]
+# A context variable, not a global: each run (and the worker threads it starts, see
+# _submit) sees only its own limiter, so concurrent summaries keep separate caps.
+_LLM_CALL_LIMITER: "contextvars.ContextVar[Optional[Callable[[], None]]]" = contextvars.ContextVar(
+    "llm_call_limiter", default=None
+)
 
 
-def _set_llm_call_limiter(fn) -> None:
-    """Install a per-run limiter (set by generate_summary)."""
-    global _LLM_CALL_LIMITER
-    _LLM_CALL_LIMITER = fn
+def _set_llm_call_limiter(fn) -> contextvars.Token:
+    """Install a per-run limiter (set by generate_summary); returns the token for _clear_llm_call_limiter."""
+    return _LLM_CALL_LIMITER.set(fn)
 
 
-def _clear_llm_call_limiter() -> None:
-    global _LLM_CALL_LIMITER
-    _LLM_CALL_LIMITER = None
+def _clear_llm_call_limiter(token: contextvars.Token) -> None:
+    _LLM_CALL_LIMITER.reset(token)
 
 
 def _bump_llm_call() -> None:
     """Count ONE paid API call attempt (including retries) and abort if over limit."""
-    if _LLM_CALL_LIMITER is not None:
-        _LLM_CALL_LIMITER()
+    limiter = _LLM_CALL_LIMITER.get()
+    if limiter is not None:
+        limiter()
+
+
+# -----------------------------
+# Helpers: concurrent LLM calls
+# -----------------------------
+# Independent calls (one per Results subsection / figures batch) are network-bound,
+# so a small thread pool cuts wall time from N*RTT to ~RTT. The sync OpenAI client
+# is thread-safe; keep the pool small to stay within provider rate limits.
+# SUMMARY_LLM_CONCURRENCY tunes the default per-pool width (per-call max_concurrency wins).
+_DEFAULT_MAX_CONCURRENCY = max(1, int(os.getenv("SUMMARY_LLM_CONCURRENCY", "8")))
+
+# Process-wide cap on requests in flight. Pools nest (batch fallbacks, section
+# map-reduce) and several summaries may run at once, so per-pool limits alone
+# don't bound the total sent to the provider.
+_LLM_INFLIGHT = threading.BoundedSemaphore(
+    int(os.getenv("SUMMARY_MAX_INFLIGHT", str(_DEFAULT_MAX_CONCURRENCY)))
+)
+
+
+def _map_concurrently(fn, items, *, max_workers: int = _DEFAULT_MAX_CONCURRENCY) -> list:
+    """
+    Like list(map(fn, items)), but runs calls on a thread pool.
+    Results keep input order; the first exception is re-raised.
+    """
+    items = list(items)
+    if max_workers <= 1 or len(items) <= 1:
+        return [fn(x) for x in items]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+        futures = [_submit(pool, fn, x) for x in items]
+        return [f.result() for f in futures]
+
+
+def _submit(pool: ThreadPoolExecutor, fn, *args) -> Future:
+    """pool.submit that runs fn in a copy of the caller's context (keeps the run's call limiter)."""
+    return pool.submit(contextvars.copy_context().run, fn, *args)
+
+
+# -----------------------------
+# Helpers: provider rate limits (opt-in)
+# -----------------------------
+# SUMMARY_LLM_RPM / SUMMARY_LLM_TPM: pace requests below the account limits so
+# concurrent MAP calls don't burst into 429s. Unset = no pacing.
+class _TokenBucket:
+    """Thread-safe token bucket refilled continuously at `per_minute`, capacity one minute."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+        self.cond = threading.Condition()
+
+    def acquire(self, amount: float) -> None:
+        # one request larger than a minute's budget waits for a full bucket, not forever
+        amount = min(float(amount), self.capacity)
+        with self.cond:
+            while True:
+                now = time.monotonic()
+                self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.level >= amount:
+                    self.level -= amount
+                    return
+                self.cond.wait((amount - self.level) / self.rate)
+
+
+def _bucket_from_env(name: str) -> Optional[_TokenBucket]:
+    value = float(os.getenv(name, "0") or 0)
+    return _TokenBucket(value) if value > 0 else None
+
+
+_RPM_BUCKET = _bucket_from_env("SUMMARY_LLM_RPM")
+_TPM_BUCKET = _bucket_from_env("SUMMARY_LLM_TPM")
+_EST_OUTPUT_TOKENS = 1024  # when the call sets no output cap
+
+
+def _throttle(kwargs: Mapping[str, Any]) -> None:
+    """Wait for request/token budget; tokens estimated as chars/4 + output cap."""
+    if _RPM_BUCKET is not None:
+        _RPM_BUCKET.acquire(1)
+    if _TPM_BUCKET is not None:
+        chars = sum(len(str(m.get("content", ""))) for m in kwargs.get("messages") or ())
+        _TPM_BUCKET.acquire(chars // 4 + (kwargs.get("max_completion_tokens") or _EST_OUTPUT_TOKENS))
+
+
+# -----------------------------
+# Helpers: transient-error retries
+# -----------------------------
+# The client is built with max_retries=0 (one paid call per request). Only errors
+# raised before the model generates anything are retried: 429s and failed
+# connections. Timeouts are not: the request may already be billed.
+_LLM_RETRIES = int(os.getenv("SUMMARY_LLM_RETRIES", "4"))
+_LLM_BACKOFF_BASE_S = 1.0
+_LLM_BACKOFF_MAX_S = 60.0
 
 
+def _chat_create(client, **kwargs) -> Any:
+    """
+    client.chat.completions.create with full-jitter exponential backoff on
+    rate limits / connection failures. Each retry counts as a call attempt.
+    Every attempt is paced by the opt-in RPM/TPM buckets first.
+    """
+    attempt = 0
+    while True:
+        _throttle(kwargs)
+        try:
+            return client.chat.completions.create(**kwargs)
+        except APITimeoutError:
+            raise
+        except (RateLimitError, APIConnectionError) as e:
+            if attempt >= _LLM_RETRIES:
+                raise
+            delay = random.uniform(0, min(_LLM_BACKOFF_MAX_S, _LLM_BACKOFF_BASE_S * (2 ** attempt)))
+            attempt += 1
+            print(f"[LLM] {type(e).__name__}; retry {attempt}/{_LLM_RETRIES} in {delay:.1f}s")
+            time.sleep(delay)
+            _bump_llm_call()
+
 
 # -----------------------------
 # Helpers: usage aggregation
@@ -170,14 +471,27 @@ def _usage_to_dict(usage_obj: Any) -> Dict[str, Any]:
 
 
 def _merge_usage(total: Dict[str, Any], add: Any) -> Dict[str, Any]:
+    # MAP helpers return tuples (usage1, usage2, ...) after retries/repairs/batching
+    if isinstance(add, (tuple, list)):
+        for u in add:
+            total = _merge_usage(total, u)
+        return total
+
     add_d = _usage_to_dict(add)
     if not add_d:
         return total
 
-    # Common token fields; keep generic merge too
-    for k in ("input_tokens", "output_tokens", "total_tokens"):
+    # Common token fields (Responses + Chat Completions naming); keep generic merge too
+    for k in ("input_tokens", "output_tokens", "prompt_tokens", "completion_tokens", "total_tokens"):
         if k in add_d:
-            total[k] = int(total.get(k, 0)) + int(add_d.get(k, 0))
+            total[k] = int(total.get(k, 0)) + int(add_d.get(k) or 0)
+
+    # Prompt-cache hits (static instructions go first, so repeated calls share a prefix).
+    # `add` may itself be a merged total (section map-reduce), which carries cached_tokens flat.
+    details = add_d.get("prompt_tokens_details") or add_d.get("input_tokens_details")
+    cached = details.get("cached_tokens") if isinstance(details, dict) else add_d.get("cached_tokens")
+    if cached:
+        total["cached_tokens"] = int(total.get("cached_tokens", 0)) + int(cached)
 
     # Keep per-call raw usages if you want later debugging
     total.setdefault("calls", [])
@@ -188,19 +502,33 @@ def _merge_usage(total: Dict[str, Any], add: Any) -> Dict[str, Any]:
 # -----------------------------
 # Helpers: language formatting
 # -----------------------------
+_LANG_MAP = {
+    "RU": "Russian",
+    "RUS": "Russian",
+    "RUSSIAN": "Russian",
+    "EN": "English",
+    "ENG": "English",
+    "ENGLISH": "English",
+}
+
+
+@functools.lru_cache(maxsize=32)
 def _lang_label(language: str) -> str:
-    lang = (language or "").strip().upper()
-    if lang in ("RU", "RUS", "RUSSIAN"):
-        return "Russian"
-    if lang in ("EN", "ENG", "ENGLISH"):
-        return "English"
     # fallback: pass through as-is
-    return language
+    return _LANG_MAP.get((language or "").strip().upper(), language)
+
+
+# Templates are module constants and languages a small set: each (template, lang)
+# pair is formatted once per process instead of on every call.
+@functools.lru_cache(maxsize=64)
+def _render_prompt(template: str, lang: str) -> str:
+    return template.format(lang=lang)
 
 
 # -----------------------------
 # Helpers: model capabilities
 # -----------------------------
+@functools.lru_cache(maxsize=32)
 def _model_supports_schema(model: str) -> bool:
     """
     Returns True if the model is expected to reliably support
@@ -224,15 +552,74 @@ def _model_supports_schema(model: str) -> bool:
     return False
 
 
-
 def _get_results_titles_from_input(article_json: Dict[str, Any]) -> List[str]:
-    def _get_res_title(item: dict) -> str:
-        return (item.get("title") or item.get("section_title") or "").strip()
+    return [
+        t
+        for r in (article_json.get("results") or [])
+        if (t := (r.get("title") or r.get("section_title") or "").strip())
+    ]
+
+
+# Field aliases seen in model replies (first non-empty wins)
+_RESULT_TITLE_KEYS = ("section_title", "title", "section")
+_RESULT_SUMMARY_KEYS = ("mini_summary", "summary", "text", "content")
+_FIG_NAME_KEYS = ("figure", "id", "name")
+_FIG_SUMMARY_KEYS = ("summary", "text", "caption_summary")
+_ABBR_KEYS = ("abbr", "abbreviation", "short")
+_ABBR_EXPANDED_KEYS = ("expanded", "expansion", "long")
+
 
-    titles = [_get_res_title(r) for r in (article_json.get("results") or []) if _get_res_title(r)]
-    return titles
+def _first_nonempty(d: Mapping[str, Any], keys: Tuple[str, ...]) -> str:
+    for k in keys:
+        v = d.get(k)
+        if isinstance(v, str):
+            v = v.strip()
+            if v:
+                return v
+    return ""
 
 
+def _fig_item(it: Any) -> Optional[Dict[str, str]]:
+    """One figures.items entry as {"figure", "summary"}, or None if unusable."""
+    if not isinstance(it, dict):
+        return None
+    name = _first_nonempty(it, _FIG_NAME_KEYS)
+    if not name:
+        return None
+    summary = _first_nonempty(it, _FIG_SUMMARY_KEYS)
+    return {"figure": name, "summary": summary} if summary else None
+
+
+def _norm_title(s: str) -> str:
+    """Match key for section titles: models sometimes change case/whitespace."""
+    return _WS_RE.sub(" ", s).strip().casefold()
+
+
+def _match_titles(pairs: Sequence[Tuple[str, str]], titles: Sequence[str]) -> List[str]:
+    """
+    Texts for `titles` from the model's (title, text) pairs: by _norm_title first; a title
+    the model translated or rewrote falls back to the pair at its position, when there
+    is exactly one pair per title and that pair's title is not another one's.
+    Unmatched titles get "".
+    """
+    by_title: Dict[str, str] = {}
+    for t, text in pairs:
+        key = _norm_title(t)
+        if key and key not in by_title:
+            by_title[key] = text
+    expected = {_norm_title(t) for t in titles}
+    positional = len(pairs) == len(titles)
+    texts: List[str] = []
+    for i, t in enumerate(titles):
+        key = _norm_title(t)
+        if key in by_title:
+            texts.append(by_title[key])
+        elif positional and _norm_title(pairs[i][0]) not in expected:
+            texts.append(pairs[i][1])
+        else:
+            texts.append("")
+    return texts
+
 
 def _normalize_summary_output(
     article_json: Dict[str, Any],
@@ -241,6 +628,7 @@ def _normalize_summary_output(
     model: str,
     language: str,
     header_defaults: Optional[Mapping[str, Any]] = None,
+    results_titles: Optional[Sequence[str]] = None,
 ) -> Dict[str, Any]:
     """
     Enforces a stable output contract for downstream writers/UI.
@@ -287,36 +675,31 @@ def _normalize_summary_output(
     out["discussion"] = disc.strip() if isinstance(disc, str) else ""
     
     # ---------- results ----------
-    expected_titles = _get_results_titles_from_input(article_json)
+    # callers that already extracted the titles pass them in
+    expected_titles = list(results_titles) if results_titles is not None else _get_results_titles_from_input(article_json)
     if not expected_titles:
         raise ValueError("No Results subsections found in input JSON.")
 
     raw_results = out.get("results")
 
-    by_title: Dict[str, str] = {}
+    # (model title, text) pairs; output titles always come from expected_titles
+    pairs: List[Tuple[str, str]] = []
 
     # Case A: model returned results as a dict: {"Title 1": "...", "Title 2": "..."}
     if isinstance(raw_results, dict):
-        for k, v in raw_results.items():
-            t = str(k or "").strip()
-            s = str(v or "").strip()
-            if t:
-                by_title[t] = s
+        pairs = [(str(k or "").strip(), str(v or "").strip()) for k, v in raw_results.items()]
 
     # Case B: model returned results as a list of objects
     elif isinstance(raw_results, list):
-        for item in raw_results:
-            if not isinstance(item, dict):
-                continue
-            t = (item.get("section_title") or item.get("title") or item.get("section") or "").strip()
-            s = (item.get("mini_summary") or item.get("summary") or item.get("text") or item.get("content") or "").strip()
-            if t:
-                by_title[t] = s
-
+        pairs = [
+            (_first_nonempty(item, _RESULT_TITLE_KEYS), _first_nonempty(item, _RESULT_SUMMARY_KEYS))
+            for item in raw_results
+            if isinstance(item, dict)
+        ]
 
     out["results"] = [
-        {"section_title": t, "mini_summary": by_title.get(t, "—") or "—"}
-        for t in expected_titles
+        {"section_title": t, "mini_summary": ms or "—"}
+        for t, ms in zip(expected_titles, _match_titles(pairs, expected_titles))
     ]
 
     # ---------- figures ----------
@@ -337,15 +720,7 @@ def _normalize_summary_output(
     if not isinstance(items, list):
         items = []
     else:
-        items = [
-            {
-                "figure": (it.get("figure") or it.get("id") or it.get("name") or "").strip(),
-                "summary": (it.get("summary") or it.get("text") or it.get("caption_summary") or "").strip(),
-            }
-            for it in items
-            if isinstance(it, dict)
-        ]
-        items = [it for it in items if it["figure"] and it["summary"]]
+        items = [x for x in map(_fig_item, items) if x is not None]
 
     figs["narrative"] = narrative
     figs["items"] = items
@@ -368,61 +743,101 @@ def _normalize_summary_output(
         for it in raw_abbr:
             if not isinstance(it, dict):
                 continue
-            ab = (it.get("abbr") or it.get("abbreviation") or it.get("short") or "").strip()
-            ex = (it.get("expanded") or it.get("expansion") or it.get("long") or "").strip()
+            ab = _first_nonempty(it, _ABBR_KEYS)
+            ex = _first_nonempty(it, _ABBR_EXPANDED_KEYS)
             if ab and ex:
                 pairs.append((ab, ex))
 
-    # de-dup by abbr (case-insensitive), keep first non-empty expanded
-    dedup: dict[str, tuple[str, str]] = {}
+    # de-dup by abbr (case-insensitive), keep first non-empty expanded;
+    # the casefolded key is computed once and reused as the sort key
+    dedup: dict[str, tuple[str, str, str]] = {}
     for ab, ex in pairs:
         key = ab.casefold()
         if key not in dedup:
-            dedup[key] = (ab, ex)
+            dedup[key] = (key, ab, ex)
 
-    abbr_list = [{"abbr": ab, "expanded": ex} for (ab, ex) in dedup.values()]
-    abbr_list.sort(key=lambda d: d["abbr"].casefold())
-    out["abbreviations"] = abbr_list
+    out["abbreviations"] = [
+        {"abbr": ab, "expanded": ex} for _, ab, ex in sorted(dedup.values(), key=itemgetter(0))
+    ]
 
     return out
 
 
+# A paragraph break: any whitespace run containing at least two newlines.
+_PARA_BREAK_RE = re.compile(r"\s*\n\s*\n\s*")
+
+
 def _split_text_into_chunks(text: str, *, max_chars: int = 6000) -> list[str]:
     """
     Split text into chunks <= max_chars, preferably on paragraph boundaries.
+    Works on paragraph offsets and slices each chunk out of the text once
+    (original paragraph breaks kept), instead of joining paragraph copies.
     """
     t = (text or "").strip()
     if not t:
         return []
-    paras = [p.strip() for p in t.split("\n\n") if p.strip()]
+
+    # (start, end) of each paragraph; t is stripped, so none is blank
+    spans: list[tuple[int, int]] = []
+    pos = 0
+    for m in _PARA_BREAK_RE.finditer(t):
+        spans.append((pos, m.start()))
+        pos = m.end()
+    spans.append((pos, len(t)))
+
     chunks: list[str] = []
-    buf: list[str] = []
-    buf_len = 0
-
-    def flush():
-        nonlocal buf, buf_len
-        if buf:
-            chunks.append("\n\n".join(buf).strip())
-            buf = []
-            buf_len = 0
-
-    for p in paras:
-        if buf_len + len(p) + 2 <= max_chars:
-            buf.append(p)
-            buf_len += len(p) + 2
+    chunk_start = -1  # -1: no open chunk
+    chunk_end = 0
+    for p_start, p_end in spans:
+        if chunk_start >= 0 and p_end - chunk_start <= max_chars:
+            chunk_end = p_end
+            continue
+        if chunk_start >= 0:
+            chunks.append(t[chunk_start:chunk_end])
+            chunk_start = -1
+        if p_end - p_start <= max_chars:
+            chunk_start, chunk_end = p_start, p_end
         else:
-            flush()
-            # paragraph might be huge; hard-split
-            if len(p) <= max_chars:
-                buf.append(p)
-                buf_len = len(p)
-            else:
-                for i in range(0, len(p), max_chars):
-                    chunks.append(p[i:i + max_chars].strip())
-    flush()
+            # paragraph is huge; hard-split
+            for i in range(p_start, p_end, max_chars):
+                piece = t[i:min(i + max_chars, p_end)].strip()
+                if piece:
+                    chunks.append(piece)
+    if chunk_start >= 0:
+        chunks.append(t[chunk_start:chunk_end])
     return chunks
 
 
+_SECTION_CHUNK_PROMPT = """
+You summarize scientific text in {lang}.
+
+Task:
+- Write a mini-summary of THIS chunk in your own words.
+- Preserve key concepts and causal links.
+- Do NOT copy sentences verbatim.
+- Do NOT include citations like [1], (1), etc.
+- Keep it concise but information-dense.
+
+Return ONLY valid JSON matching the schema.
+"""
+
+
+def _section_lang(language: str) -> str:
+    lang = (language or "").strip().upper()
+    return lang if lang in ("EN", "RU") else "EN"
+
+
+def _section_chunk_request(*, language: str, section_name: str, chunk_text: str) -> Dict[str, Any]:
+    """_call_json_schema kwargs of one section map (chunk) call."""
+    return {
+        "prompt": _render_prompt(_SECTION_CHUNK_PROMPT, _section_lang(language)),
+        "instructions": f"SECTION: {section_name}",
+        "payload_obj": chunk_text,  # plain text: no JSON escaping of the chunk
+        "schema": SECTION_CHUNK_SCHEMA,
+        "max_tokens": _MINI_MAX_TOKENS,
+    }
+
+
 def _summarize_section_chunk(
     client,
     *,
@@ -434,37 +849,51 @@ def _summarize_section_chunk(
     """
     Map step: produce a concise mini-summary for one chunk.
     """
-    schema = {
-        "type": "object",
-        "properties": {"mini_summary": {"type": "string"}},
-        "required": ["mini_summary"],
-    }
-    lang = (language or "").strip().upper()
-    if lang not in ("EN", "RU"):
-        lang = "EN"
+    out, usage = _call_json_schema(
+        client,
+        model=model,
+        **_section_chunk_request(language=language, section_name=section_name, chunk_text=chunk_text),
+    )
+    ms = (out.get("mini_summary") or "").strip() if isinstance(out, dict) else ""
+    return ms, usage
 
-    prompt = f"""
-You summarize scientific text in {lang}.
-SECTION: {section_name}
+
+# Output caps (classic chat models only, see _sampling_kwargs): generous enough for
+# RU text + JSON framing, so they only stop runaway replies, never a normal one.
+# A reply that still hits its cap is retried once with twice the cap.
+_MINI_MAX_TOKENS = 1024
+# Conservative for Cyrillic on older tokenizers (English runs ~4 chars per token)
+_MIN_CHARS_PER_TOKEN = 1.5
+# JSON keys, quotes and escapes around the text
+_JSON_OVERHEAD_TOKENS = 256
+
+
+def _section_max_tokens(hard_cap_chars: int) -> int:
+    # floor keeps short sections comfortable
+    return max(_MINI_MAX_TOKENS, int(hard_cap_chars / _MIN_CHARS_PER_TOKEN) + _JSON_OVERHEAD_TOKENS)
+
+
+def _section_length_budget(source_len: int, target_ratio: float) -> tuple[int, int]:
+    # target size in characters (rough but effective; docx is text-based)
+    target_chars = max(300, int(source_len * target_ratio))
+    hard_cap = int(target_chars * 1.15)  # allow a bit
+    return target_chars, hard_cap
+
+
+_SECTION_REDUCE_PROMPT = """
+You write a structured scientific summary in {lang}.
+
+Input:
+- A list of mini-summaries (bullet points), each summarizing a chunk.
 
 Task:
-- Write a mini-summary of THIS chunk in your own words.
-- Preserve key concepts and causal links.
-- Do NOT copy sentences verbatim.
+- Merge them into a coherent section summary.
+- Use your own words; do NOT copy from source.
 - Do NOT include citations like [1], (1), etc.
-- Keep it concise but information-dense.
+- Respect the target length and hard cap given with the input.
 
 Return ONLY valid JSON matching the schema.
 """
-    out, usage = _call_json_schema(
-        client,
-        model=model,
-        prompt=prompt,
-        payload_obj={"chunk": chunk_text},
-        schema=schema,
-    )
-    ms = (out.get("mini_summary") or "").strip() if isinstance(out, dict) else ""
-    return ms, usage
 
 
 def _reduce_section_summaries(
@@ -480,43 +909,95 @@ def _reduce_section_summaries(
     """
     Reduce step: merge mini-summaries into a section summary of ~target_ratio of source length.
     """
-    schema = {
-        "type": "object",
-        "properties": {"text": {"type": "string"}},
-        "required": ["text"],
-    }
     lang = (language or "").strip().upper()
     if lang not in ("EN", "RU"):
         lang = "EN"
 
-    # target size in characters (rough but effective; docx is text-based)
-    target_chars = max(300, int(source_len * target_ratio))
-    hard_cap = int(target_chars * 1.15)  # allow a bit
+    target_chars, hard_cap = _section_length_budget(source_len, target_ratio)
 
     joined = "\n".join(f"- {s}" for s in mini_summaries if s.strip())
 
-    prompt = f"""
-You write a structured scientific summary in {lang}.
+    prompt = _render_prompt(_SECTION_REDUCE_PROMPT, lang)
+    instructions = f"""
 SECTION: {section_name}
+- Target length: about {target_chars} characters (±15%).
+- Hard cap: {hard_cap} characters.
+"""
+    out, usage = _call_json_schema(
+        client,
+        model=model,
+        prompt=prompt,
+        instructions=instructions,
+        payload_obj=joined,
+        schema=SECTION_REDUCE_SCHEMA,
+        max_tokens=_section_max_tokens(hard_cap),
+    )
+    txt = (out.get("text") or "").strip() if isinstance(out, dict) else ""
+    if len(txt) > hard_cap:
+        txt = txt[:hard_cap].rstrip() + "…"
+    return txt, usage
+
+
+_SECTION_DIRECT_PROMPT = """
+You write a structured scientific summary in {lang}.
 
 Input:
-- A list of mini-summaries (bullet points), each summarizing a chunk.
+- The full text of one article section.
 
 Task:
-- Merge them into a coherent section summary.
+- Summarize it as a coherent section summary.
+- Preserve key concepts and causal links.
 - Use your own words; do NOT copy from source.
 - Do NOT include citations like [1], (1), etc.
-- Target length: about {target_chars} characters (±15%).
-- Hard cap: {hard_cap} characters.
+- Respect the target length and hard cap given with the input.
 
 Return ONLY valid JSON matching the schema.
 """
+
+
+def _section_direct_request(
+    *,
+    language: str,
+    section_name: str,
+    source_text: str,
+    target_ratio: float,
+) -> Dict[str, Any]:
+    """_call_json_schema kwargs of the single call for a one-chunk section."""
+    target_chars, hard_cap = _section_length_budget(len(source_text), target_ratio)
+    instructions = f"""
+SECTION: {section_name}
+- Target length: about {target_chars} characters (±15%).
+- Hard cap: {hard_cap} characters.
+"""
+    return {
+        "prompt": _render_prompt(_SECTION_DIRECT_PROMPT, _section_lang(language)),
+        "instructions": instructions,
+        "payload_obj": source_text,
+        "schema": SECTION_REDUCE_SCHEMA,
+        "max_tokens": _section_max_tokens(hard_cap),
+    }
+
+
+def _summarize_section_direct(
+    client,
+    *,
+    model: str,
+    language: str,
+    section_name: str,
+    source_text: str,
+    target_ratio: float,
+) -> tuple[str, dict]:
+    """
+    Short section (fits one chunk): summarize to the target length in one call,
+    instead of a map call whose mini-summary is then reduced again.
+    """
+    _, hard_cap = _section_length_budget(len(source_text), target_ratio)
     out, usage = _call_json_schema(
         client,
         model=model,
-        prompt=prompt,
-        payload_obj={"mini_summaries": joined},
-        schema=schema,
+        **_section_direct_request(
+            language=language, section_name=section_name, source_text=source_text, target_ratio=target_ratio
+        ),
     )
     txt = (out.get("text") or "").strip() if isinstance(out, dict) else ""
     if len(txt) > hard_cap:
@@ -524,6 +1005,59 @@ Return ONLY valid JSON matching the schema.
     return txt, usage
 
 
+_SECTION_CHUNK_CHARS = 6000
+_SECTION_MIN_CHARS = 200
+
+
+def _section_map_inputs(
+    source_text: str,
+    *,
+    chunk_chars: int = _SECTION_CHUNK_CHARS,
+    min_chars: int = _SECTION_MIN_CHARS,
+) -> Tuple[Optional[str], List[str]]:
+    """
+    First round of a section map-reduce: (text, []) for a section that fits one
+    chunk, (None, distinct chunks) for a longer one, (None, []) for a stub.
+    """
+    if len(source_text.strip()) < min_chars:
+        return None, []
+    chunks = _split_text_into_chunks(source_text, max_chars=chunk_chars)
+    if len(chunks) == 1:
+        return chunks[0], []
+
+    # Repeated chunks (boilerplate; whitespace differences ignored) are summarized
+    # once; the reduce only needs each distinct mini-summary once, in first-occurrence order.
+    seen: set[str] = set()
+    unique_chunks: list[str] = []
+    for ch in chunks:
+        key = _WS_RE.sub(" ", ch).strip()
+        if key not in seen:
+            seen.add(key)
+            unique_chunks.append(ch)
+    return None, unique_chunks
+
+
+def _section_map_requests(
+    *,
+    language: str,
+    section_name: str,
+    source_text: str,
+    target_ratio: float,
+) -> List[Dict[str, Any]]:
+    """_call_json_schema kwargs of the first round of _summarize_long_section_map_reduce."""
+    direct_text, unique_chunks = _section_map_inputs(source_text)
+    if direct_text is not None:
+        return [
+            _section_direct_request(
+                language=language, section_name=section_name, source_text=direct_text, target_ratio=target_ratio
+            )
+        ]
+    return [
+        _section_chunk_request(language=language, section_name=section_name, chunk_text=ch)
+        for ch in unique_chunks
+    ]
+
+
 def _summarize_long_section_map_reduce(
     client,
     *,
@@ -532,25 +1066,41 @@ def _summarize_long_section_map_reduce(
     section_name: str,
     source_text: str,
     target_ratio: float,
-    chunk_chars: int = 6000,
+    chunk_chars: int = _SECTION_CHUNK_CHARS,
+    max_workers: int = _DEFAULT_MAX_CONCURRENCY,
+    min_chars: int = _SECTION_MIN_CHARS,
 ) -> tuple[str, dict]:
     """
     Full map-reduce for one long section.
+    Chunk calls are independent and run concurrently (order preserved for the reduce).
+    A section that fits in one chunk takes a single direct call instead; one shorter
+    than min_chars (a stub or parser leftover) gets no call and returns "".
     """
     usage_total: dict = {}
-    chunks = _split_text_into_chunks(source_text, max_chars=chunk_chars)
-    if not chunks:
+    direct_text, unique_chunks = _section_map_inputs(source_text, chunk_chars=chunk_chars, min_chars=min_chars)
+    if direct_text is not None:
+        return _summarize_section_direct(
+            client,
+            model=model,
+            language=language,
+            section_name=section_name,
+            source_text=direct_text,
+            target_ratio=target_ratio,
+        )
+    if not unique_chunks:
         return "", usage_total
 
-    minis: list[str] = []
-    for ch in chunks:
-        ms, u = _summarize_section_chunk(
+    def _map_chunk(ch: str) -> tuple[str, dict]:
+        return _summarize_section_chunk(
             client,
             model=model,
             language=language,
             section_name=section_name,
             chunk_text=ch,
         )
+
+    minis: list[str] = []
+    for ms, u in _map_concurrently(_map_chunk, unique_chunks, max_workers=max_workers):
         usage_total = _merge_usage(usage_total, u)
         if ms:
             minis.append(ms)
@@ -571,8 +1121,20 @@ def _summarize_long_section_map_reduce(
     usage_total = _merge_usage(usage_total, u2)
     return reduced, usage_total
 
-def _ensure_key_points(
-    client,
+
+_KEY_POINTS_PROMPT = """
+You write key points in {lang}.
+Task:
+- Produce 3–8 bullet points capturing the most important findings and takeaways.
+- Do NOT copy sentences verbatim.
+- No citations like [1], (1), etc.
+
+Return ONLY valid JSON matching the schema.
+"""
+
+
+def _ensure_key_points(
+    client,
     *,
     model: str,
     language: str,
@@ -586,11 +1148,6 @@ def _ensure_key_points(
     if isinstance(kp, list) and any(isinstance(x, str) and x.strip() for x in kp):
         return [x.strip() for x in kp if isinstance(x, str) and x.strip()], usage_total
 
-    schema = {
-        "type": "object",
-        "properties": {"key_points": {"type": "array", "items": {"type": "string"}}},
-        "required": ["key_points"],
-    }
     lang = (language or "").strip().upper()
     if lang not in ("EN", "RU"):
         lang = "EN"
@@ -601,16 +1158,8 @@ def _ensure_key_points(
         "discussion": summary.get("discussion", ""),
     }
 
-    prompt = f"""
-You write key points in {lang}.
-Task:
-- Produce 3–8 bullet points capturing the most important findings and takeaways.
-- Do NOT copy sentences verbatim.
-- No citations like [1], (1), etc.
-
-Return ONLY valid JSON matching the schema.
-"""
-    out, u = _call_json_schema(client, model=model, prompt=prompt, payload_obj=payload, schema=schema)
+    prompt = _render_prompt(_KEY_POINTS_PROMPT, lang)
+    out, u = _call_json_schema(client, model=model, prompt=prompt, payload_obj=payload, schema=KEY_POINTS_SCHEMA)
     usage_total = _merge_usage(usage_total, u)
 
     pts = out.get("key_points") if isinstance(out, dict) else []
@@ -623,56 +1172,90 @@ Return ONLY valid JSON matching the schema.
 # -----------------------------
 # Helpers: figure references
 # -----------------------------
+# One scan finds and classifies refs: a match is supplementary when either named
+# group took part ("Supplementary Fig. 2", "Fig. S1", "Figure S2", "Figs. S3-S4").
+# The plural "s" must be followed by "." or a space, so the "S" of "FigS3" /
+# "FigureS2" / "Figs3" is left to supp_s.
 _FIG_REF_RE = re.compile(
-    r"\b(?:Supplementary\s+)?(?:Fig(?:ure)?s?)\.?\s*"
-    r"(?:S\s*)?\d+[A-Za-z]?(?:\s*[–-]\s*\d+[A-Za-z]?)?(?:[a-z])?\b",
+    r"\b(?P<supp>Supplementary\s+)?Fig(?:ure)?(?:s(?=[\s.]))?\.?\s*"
+    r"(?P<supp_s>S\s*)?\d+[A-Za-z]?(?:\s*[–-]\s*\d+[A-Za-z]?)?[a-z]?\b",
     flags=re.IGNORECASE,
 )
+_WS_RE = re.compile(r"\s+")
 
 
 def _normalize_fig_ref(s: str) -> str:
     # normalize whitespace and dashes, keep case-insensitive compare
-    s2 = re.sub(r"\s+", " ", s.strip())
+    s2 = _WS_RE.sub(" ", s.strip())
     s2 = s2.replace("–", "-")
     return s2.lower()
 
 
-def _is_supplementary_ref(ref: str) -> bool:
-    r = ref.lower()
-    # ignore anything explicitly marked supplementary or Fig S...
-    if "supplementary" in r:
-        return True
-    # detect "Fig. S1", "Figure S2", "Figs. S3-S4", "Fig S1"
-    if re.search(r"\bfig(?:ure)?s?\.?\s*s\s*\d", r):
-        return True
-    return False
+def extract_non_supp_figure_refs(text: str) -> List[str]:
+    return [raw for raw, _ in _extract_fig_ref_pairs(text)]
 
 
-def extract_non_supp_figure_refs(text: str) -> List[str]:
-    if not text:
-        return []
-    found: List[str] = []
+def _extract_fig_ref_pairs(text: str) -> Tuple[Tuple[str, str], ...]:
+    """
+    Non-supplementary figure refs as (raw, normalized) pairs, first occurrence order,
+    so callers never re-normalize what extraction already normalized.
+    """
+    # every match contains "fig"; skip the regex (and the cache) for texts without it
+    if not text or "fig" not in text.lower():
+        return ()
+    return _extract_fig_ref_pairs_cached(text)
+
+
+# Captions / section texts / mini-summaries are scanned repeatedly within one run
+# (batch payloads, retries, repairs); cleared at the end of generate_summary.
+@functools.lru_cache(maxsize=1024)
+def _extract_fig_ref_pairs_cached(text: str) -> Tuple[Tuple[str, str], ...]:
+    found: List[Tuple[str, str]] = []
     seen_norm: set[str] = set()
     for m in _FIG_REF_RE.finditer(text):
-        ref = m.group(0).strip()
-        if _is_supplementary_ref(ref):
+        if m.group("supp") or m.group("supp_s"):
             continue
+        ref = m.group(0).strip()
         n = _normalize_fig_ref(ref)
         if n in seen_norm:
             continue
         seen_norm.add(n)
-        found.append(ref)
-    return found
+        found.append((ref, n))
+    return tuple(found)
 
 
-def _contains_all_refs(text: str, required_refs: List[str]) -> Tuple[bool, List[str]]:
-    if not required_refs:
+# Below this many refs, a few substring scans beat building an automaton.
+_AC_MIN_REFS = 4
+
+
+def _contains_all_refs(text: str, required: Sequence[Tuple[str, str]]) -> Tuple[bool, List[str]]:
+    """
+    required: (raw, normalized) pairs from _extract_fig_ref_pairs, normalized once
+    at extraction so validate/repair rounds only normalize the summary text.
+    Returns (ok, missing raw refs).
+    """
+    if not required:
+        return True, []
+
+    # Fast path: refs the text itself cites (one cached regex pass, set lookups).
+    # Whatever is left falls back to substring search, e.g. "fig. 1" inside "fig. 1a".
+    found = {n for _, n in _extract_fig_ref_pairs(text or "")}
+    norm_refs = [n for _, n in required if n not in found]
+    if not norm_refs:
         return True, []
     tnorm = _normalize_fig_ref(text or "")
-    missing: List[str] = []
-    for ref in required_refs:
-        if _normalize_fig_ref(ref) not in tnorm:
-            missing.append(ref)
+
+    if ahocorasick is not None and len(norm_refs) >= _AC_MIN_REFS:
+        # one linear pass over the text for all refs
+        ac = ahocorasick.Automaton()
+        for n in norm_refs:
+            ac.add_word(n, n)
+        ac.make_automaton()
+        found.update(n for _, n in ac.iter(tnorm))
+    else:
+        found.update(n for n in norm_refs if n in tnorm)
+
+    missing = [ref for ref, n in required if n not in found]
     return (len(missing) == 0), missing
 
 
@@ -684,31 +1267,27 @@ def _extract_response_text(resp: Any) -> str:
     Tries to extract plain text from different OpenAI SDK response shapes.
     Works for both Responses API and Chat Completions.
     """
-    # Responses API (newer): resp.output_text
-    if hasattr(resp, "output_text") and isinstance(resp.output_text, str) and resp.output_text.strip():
-        return resp.output_text
-
-    # Responses API: resp.output[].content[].text
-    if hasattr(resp, "output"):
-        try:
-            for item in resp.output:
-                content = getattr(item, "content", None)
-                if not content:
-                    continue
-                for block in content:
-                    text = getattr(block, "text", None)
-                    if isinstance(text, str) and text.strip():
-                        return text
-        except Exception:
-            pass
+    # Responses API (newer): resp.output_text -- the common case, no exception handling
+    ot = getattr(resp, "output_text", None)
+    if isinstance(ot, str) and ot:
+        return ot
 
+    # Responses API: resp.output[].content[].text (joined, like output_text)
     # Chat Completions: resp.choices[0].message.content
     try:
+        joined = "".join(
+            text
+            for item in getattr(resp, "output", None) or ()
+            for block in getattr(item, "content", None) or ()
+            if isinstance(text := getattr(block, "text", None), str)
+        )
+        if joined:
+            return joined
+
         choices = getattr(resp, "choices", None)
         if choices:
-            msg = getattr(choices[0], "message", None)
-            content = getattr(msg, "content", None)
-            if isinstance(content, str) and content.strip():
+            content = getattr(getattr(choices[0], "message", None), "content", None)
+            if isinstance(content, str) and content:
                 return content
     except Exception:
         pass
@@ -716,6 +1295,10 @@ def _extract_response_text(resp: Any) -> str:
     return str(resp)
 
 
+_JSON_FENCE_HEAD_RE = re.compile(r"^```[a-zA-Z]*\s*")
+_JSON_FENCE_TAIL_RE = re.compile(r"\s*```$")
+
+
 def _strip_json_fence(txt: str) -> str:
     """
     Removes ```json ... ``` wrappers if model returns fenced code.
@@ -723,11 +1306,130 @@ def _strip_json_fence(txt: str) -> str:
     if not isinstance(txt, str):
         return txt
     t = txt.strip()
-    # ```json ... ```
-    if t.startswith("```"):
-        t = re.sub(r"^```[a-zA-Z]*\s*", "", t)
-        t = re.sub(r"\s*```$", "", t)
-    return t.strip()
+    # common case: no fence (prompts forbid it) -> no regex work
+    if not t.startswith("```"):
+        return t
+    # ```json ... ``` (both subs also eat the whitespace next to the fences)
+    t = _JSON_FENCE_HEAD_RE.sub("", t)
+    return _JSON_FENCE_TAIL_RE.sub("", t)
+
+
+# `"key": ""` / `"key": null` inside a JSON reply that is still streaming
+_EMPTY_JSON_FIELD_RE = re.compile(r'"(\w+)"\s*:\s*(?:""|null)')
+
+
+def _collect_chat_stream(
+    stream: Any,
+    on_empty_field: Optional[Callable[[str], None]] = None,
+) -> Tuple[str, Any, Optional[str]]:
+    """
+    Accumulates a streamed Chat Completion into (text, usage, finish_reason).
+    Usage arrives in the final chunk (stream_options.include_usage).
+    on_empty_field(key) is called once per key as soon as the reply shows it empty,
+    so follow-up work can start while the rest is still generating.
+    """
+    parts: List[str] = []
+    usage = None
+    finish_reason = None
+    tail = ""
+    seen_empty: set[str] = set()
+    for chunk in stream:
+        if getattr(chunk, "usage", None) is not None:
+            usage = chunk.usage
+        for choice in getattr(chunk, "choices", None) or ():
+            finish_reason = getattr(choice, "finish_reason", None) or finish_reason
+            delta = getattr(getattr(choice, "delta", None), "content", None)
+            if delta:
+                parts.append(delta)
+                if on_empty_field is not None:
+                    # short overlap catches a field split across deltas
+                    tail = tail[-64:] + delta
+                    for m in _EMPTY_JSON_FIELD_RE.finditer(tail):
+                        if m.group(1) not in seen_empty:
+                            seen_empty.add(m.group(1))
+                            on_empty_field(m.group(1))
+    return "".join(parts), usage, finish_reason
+
+
+# Appended to every JSON-call system prompt
+_JSON_OUTPUT_RULE = (
+    "\n\n"
+    "CRITICAL OUTPUT RULE:\n"
+    "- Return ONLY a single valid JSON object.\n"
+    "- No markdown, no code fences, no commentary.\n"
+    "- Ensure the JSON is strictly parseable by json.loads.\n"
+)
+
+# Models whose API rejected strict json_schema output once; they stay on json_object mode.
+_STRICT_SCHEMA_REJECTED: set[str] = set()
+
+
+def _json_schema_messages(*, prompt: str, payload_obj: Any, instructions: str = "") -> List[Dict[str, str]]:
+    """System = static prompt + JSON rule; user = per-call instructions + payload."""
+    # callers may pass an already-serialized payload (e.g. the whole article) to skip re-encoding
+    payload_text = payload_obj if isinstance(payload_obj, str) else _json_dumps(payload_obj)
+    instructions = (instructions or "").strip()
+    return [
+        {"role": "system", "content": prompt + _JSON_OUTPUT_RULE},
+        {"role": "user", "content": f"{instructions}\n\n{payload_text}" if instructions else payload_text},
+    ]
+
+
+def _response_format(schema: Dict[str, Any], *, strict: bool) -> Dict[str, Any]:
+    if strict:
+        return {
+            "type": "json_schema",
+            "json_schema": {"name": "response", "schema": schema, "strict": True},
+        }
+    return {"type": "json_object"}
+
+
+def _sampling_kwargs(model: str, max_tokens: Optional[int]) -> Dict[str, Any]:
+    """
+    Output cap + deterministic sampling for classic chat models only: GPT-5.x spends
+    hidden reasoning tokens out of max_completion_tokens (a cap can leave an empty
+    reply) and rejects a non-default temperature.
+    """
+    if _model_supports_schema(model):
+        return {}
+    kwargs: Dict[str, Any] = {"temperature": 0}
+    if max_tokens:
+        kwargs["max_completion_tokens"] = max_tokens
+    return kwargs
+
+
+def _request_key(*, model: str, messages: List[Dict[str, str]], schema: Dict[str, Any]) -> str:
+    """Content key of a JSON call (shared by the on-disk cache and batch replies)."""
+    return JsonSchemaCache.make_key(
+        provider="openai",
+        model=model,
+        prompt=messages[0]["content"],
+        payload=messages[1]["content"],
+        schema=schema,
+    )
+
+
+def _parse_json_reply(txt: str, *, model: str, schema: Dict[str, Any], strict: bool) -> Any:
+    # server-side schema enforcement never emits fences; prompt-enforced modes may
+    if not strict:
+        txt = _strip_json_fence(txt)
+
+    # DEBUG: show raw model output
+    _log_llm_output(kind="json_schema", model=model, text=txt)
+
+    try:
+        parsed = _json_loads(txt)
+    except Exception as ex:
+        # Important: dump raw output for debugging (already saved), then raise
+        raise RuntimeError(f"Failed to parse model JSON output. Raw output saved to {_DBG_DIR}.") from ex
+
+    validator = _get_validator(schema)
+    if validator is not None:
+        try:
+            validator(parsed)
+        except _SCHEMA_ERRORS as ex:
+            _dbg_print(f"[LLM-SCHEMA] reply does not match schema: {ex}")
+    return parsed
 
 
 def _call_json_schema(
@@ -737,66 +1439,231 @@ def _call_json_schema(
     prompt: str,
     payload_obj: Any,
     schema: Dict[str, Any],
+    instructions: str = "",
+    max_tokens: Optional[int] = None,
+    on_empty_field: Optional[Callable[[str], None]] = None,
+    accept: Optional[Callable[[Any], bool]] = None,
 ) -> Tuple[Dict[str, Any], Any]:
     """
-    HARD RULE: exactly ONE paid API call per request.
+    At most TWO generations per request: the reply, plus one resend with twice the
+    max_completion_tokens when it is cut off (see _call_json_schema_live). Each of
+    them may also take up to _LLM_RETRIES extra attempts on 429 / connection errors
+    (_chat_create; counted against the call limits) and one json_object resend after
+    a strict-schema 400 (rejected before generation, so not billed). Worst case with
+    the defaults: 2 * 2 * (1 + 4) = 20 requests.
     We use Chat Completions only (no Responses API fallback) to avoid double-billing.
-    """
-    payload_text = json.dumps(payload_obj, ensure_ascii=False)
 
-    enforced_prompt = (
-        prompt
-        + "\n\n"
-        + "CRITICAL OUTPUT RULE:\n"
-        + "- Return ONLY a single valid JSON object.\n"
-        + "- No markdown, no code fences, no commentary.\n"
-        + "- Ensure the JSON is strictly parseable by json.loads.\n"
+    GPT-5.x: structured outputs (response_format json_schema, strict) so the reply
+    is guaranteed to match `schema`; others: json_object mode + prompt rules.
+
+    Message layout is cache-friendly: `prompt` (static per language) goes first as
+    the system message; per-call `instructions` and the payload go last.
+
+    With the LLM cache enabled (AI_SUMMARY_CACHE_DIR or BRAINWORM_LLM_CACHE=1), replies
+    are cached on disk by request content; a hit makes no API call, does not count
+    against the call limits and reports no usage (nothing was billed).
+
+    on_empty_field: see _collect_chat_stream; only fires for a live streamed reply.
+    accept: the caller's check on the parsed reply; a reply it rejects (and will
+    regenerate) is returned but not cached, so a re-run does not replay it.
+    """
+    messages = _json_schema_messages(prompt=prompt, payload_obj=payload_obj, instructions=instructions)
+
+    cache = get_llm_cache()
+    cache_key = _request_key(model=model, messages=messages, schema=schema)
+    if cache is not None:
+        hit = cache.get(cache_key)
+        if hit is not None:
+            _dbg_print(f"[LLM-CACHE] hit {cache_key[:12]} model={model}")
+            return hit[0], None
+
+    # batch_mode: the reply may already have come back from a Batch API job; it
+    # counts against the call limits here, when used, so a request the job did not
+    # answer is counted once, by the live call that replaces it
+    prefetched = _take_batch_reply(cache_key)
+    if prefetched is not None:
+        _bump_llm_call()
+        parsed, usage = prefetched
+        if cache is not None and (accept is None or accept(parsed)):
+            cache.put(cache_key, parsed, _usage_to_dict(usage))
+        return parsed, usage
+
+    call_live = functools.partial(
+        _call_json_schema_live,
+        client,
+        model=model,
+        messages=messages,
+        schema=schema,
+        max_tokens=max_tokens,
+        cache=cache,
+        cache_key=cache_key,
+        on_empty_field=on_empty_field,
+        accept=accept,
     )
 
-    # One call only
+    # An identical request already in flight (duplicate section, concurrent runs of
+    # one article) is waited for instead of paid for again; followers get a copy of
+    # the reply and no usage. The Future holds a snapshot nobody else touches, so the
+    # owner's caller can mutate its reply while followers are still copying.
+    with _INFLIGHT_CALLS_LOCK:
+        owner_future = _INFLIGHT_CALLS.get(cache_key)
+        is_owner = owner_future is None
+        if is_owner:
+            owner_future = Future()
+            _INFLIGHT_CALLS[cache_key] = owner_future
+    if not is_owner:
+        _dbg_print(f"[LLM-COALESCE] waiting for in-flight {cache_key[:12]} model={model}")
+        try:
+            return copy.deepcopy(owner_future.result()[0]), None
+        except Exception as ex:
+            # The owner may belong to another run and fail for its own reasons (its
+            # call cap, say): make the call here, on this run's budget.
+            _dbg_print(f"[LLM-COALESCE] in-flight {cache_key[:12]} failed ({type(ex).__name__}); calling live")
+            return call_live()
+
     try:
-        resp = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "user", "content": enforced_prompt},
-                {"role": "user", "content": payload_text},
-            ],
-            response_format={"type": "json_object"},
-            timeout=60,
-        )
-    except TypeError:
-        # Older SDKs may not support response_format/timeout kwargs
-        resp = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "user", "content": enforced_prompt},
-                {"role": "user", "content": payload_text},
-            ],
-        )
+        result = call_live()
+    except BaseException as ex:
+        owner_future.set_exception(ex)
+        raise
+    else:
+        parsed, usage = result
+        owner_future.set_result((copy.deepcopy(parsed), usage))
+        return result
+    finally:
+        with _INFLIGHT_CALLS_LOCK:
+            _INFLIGHT_CALLS.pop(cache_key, None)
 
-    usage = getattr(resp, "usage", None)
 
-    # Extract text
-    txt = ""
-    try:
-        # OpenAI-style: resp.choices[0].message.content
-        choices = getattr(resp, "choices", None) or []
-        if choices:
-            msg = getattr(choices[0], "message", None)
-            txt = (getattr(msg, "content", None) or "").strip()
-    except Exception:
-        txt = ""
+# request key -> Future of the one live call for it (see _call_json_schema)
+_INFLIGHT_CALLS: Dict[str, "Future[Tuple[Any, Any]]"] = {}
+_INFLIGHT_CALLS_LOCK = threading.Lock()
 
-    txt = _strip_json_fence(txt)
 
-    # DEBUG: show raw model output
-    _log_llm_output(kind="json_schema", model=model, text=txt)
+def _is_schema_rejection(ex: Exception) -> bool:
+    """True when a 400 is about response_format / json_schema, not the request itself."""
+    body = getattr(ex, "body", None)
+    if not isinstance(body, dict):
+        body = {}
+    if isinstance(body.get("error"), dict):
+        body = body["error"]
+    param = str(getattr(ex, "param", None) or body.get("param") or "")
+    code = str(getattr(ex, "code", None) or body.get("code") or "")
+    if param.startswith("response_format") or "schema" in code:
+        return True
+    message = str(getattr(ex, "message", None) or body.get("message") or ex).lower()
+    return "response_format" in message or "json_schema" in message
 
-    try:
-        parsed = json.loads(txt)
-    except Exception as ex:
-        # Important: dump raw output for debugging (already saved), then raise
-        raise RuntimeError(f"Failed to parse model JSON output. Raw output saved to {_DBG_DIR}.") from ex
+
+def _call_json_schema_live(
+    client,
+    *,
+    model: str,
+    messages: List[Dict[str, str]],
+    schema: Dict[str, Any],
+    max_tokens: Optional[int],
+    cache: Optional[JsonSchemaCache],
+    cache_key: str,
+    on_empty_field: Optional[Callable[[str], None]] = None,
+    accept: Optional[Callable[[Any], bool]] = None,
+    length_retry: bool = True,
+) -> Tuple[Any, Any]:
+    """
+    The paid part of _call_json_schema: one Chat Completions request (two when the
+    reply is cut off by max_tokens and length_retry is set).
+    """
+    _bump_llm_call()
+
+    strict = _model_supports_schema(model) and model not in _STRICT_SCHEMA_REJECTED
+    response_format = _response_format(schema, strict=strict)
+    sampling = _sampling_kwargs(model, max_tokens)
+
+    stream_kwargs: Dict[str, Any] = {}
+    if _STREAM_RESPONSES:
+        stream_kwargs = {"stream": True, "stream_options": {"include_usage": True}}
+
+    # Global in-flight cap across all pools (nested MAP/fallback calls included);
+    # held for the request and, when streaming, until the reply is fully read.
+    with _LLM_INFLIGHT:
+        # One call only (a 400 is rejected before generation, so it is not billed)
+        try:
+            resp = _chat_create(
+                client,
+                model=model,
+                messages=messages,
+                response_format=response_format,
+                timeout=60,
+                **sampling,
+                **stream_kwargs,
+            )
+        except TypeError:
+            # Older SDKs may not support response_format/timeout/stream_options kwargs
+            stream_kwargs = {}
+            strict = False
+            resp = _chat_create(
+                client,
+                model=model,
+                messages=messages,
+            )
+        except BadRequestError as ex:
+            # only a rejected schema is worth a second try; a 400 for anything else
+            # (context length, bad parameter) would just fail again
+            if not strict or not _is_schema_rejection(ex):
+                raise
+            # strict schema not accepted for this model: fall back to json_object mode
+            _STRICT_SCHEMA_REJECTED.add(model)
+            strict = False
+            resp = _chat_create(
+                client,
+                model=model,
+                messages=messages,
+                response_format={"type": "json_object"},
+                timeout=60,
+                **sampling,
+                **stream_kwargs,
+            )
+
+        if stream_kwargs:
+            txt, usage, finish_reason = _collect_chat_stream(resp, on_empty_field)
+            txt = txt.strip()
+        else:
+            usage = getattr(resp, "usage", None)
+
+            # Extract text
+            txt = ""
+            finish_reason = None
+            try:
+                # OpenAI-style: resp.choices[0].message.content
+                choices = getattr(resp, "choices", None) or []
+                if choices:
+                    msg = getattr(choices[0], "message", None)
+                    txt = (getattr(msg, "content", None) or "").strip()
+                    finish_reason = getattr(choices[0], "finish_reason", None)
+            except Exception:
+                txt = ""
+
+    # Cut off by the output cap: the JSON is incomplete, so don't try to parse it
+    if finish_reason == "length" and "max_completion_tokens" in sampling and length_retry:
+        print(f"[LLM] reply hit max_completion_tokens={max_tokens}; retrying once with {max_tokens * 2}")
+        parsed, retry_usage = _call_json_schema_live(
+            client,
+            model=model,
+            messages=messages,
+            schema=schema,
+            max_tokens=max_tokens * 2,
+            cache=cache,
+            cache_key=cache_key,
+            on_empty_field=on_empty_field,
+            accept=accept,
+            length_retry=False,
+        )
+        return parsed, (usage, retry_usage)
+
+    parsed = _parse_json_reply(txt, model=model, schema=schema, strict=strict)
+
+    # a reply the caller rejects and regenerates must not be pinned (cf. _call_text)
+    if cache is not None and (accept is None or accept(parsed)):
+        cache.put(cache_key, parsed, _usage_to_dict(usage))
 
     # DEBUG: minimal structure info
     try:
@@ -810,28 +1677,43 @@ def _call_json_schema(
     return parsed, usage
 
 
-
 def _call_text(
     client,
     *,
     model: str,
     prompt: str,
     timeout_s: int = 60,
+    max_tokens: Optional[int] = None,
 ) -> tuple[str, Any]:
     """
     Text-only call via Chat Completions (single call, no Responses API).
+    Goes through the same opt-in LLM cache as _call_json_schema (schema=None).
     """
-    try:
-        resp = client.chat.completions.create(
-            model=model,
-            messages=[{"role": "user", "content": prompt}],
-            timeout=timeout_s,
-        )
-    except TypeError:
-        resp = client.chat.completions.create(
-            model=model,
-            messages=[{"role": "user", "content": prompt}],
-        )
+    cache = get_llm_cache()
+    cache_key = ""
+    if cache is not None:
+        cache_key = cache.make_key(provider="openai", model=model, prompt=prompt, payload="", schema=None)
+        hit = cache.get(cache_key)
+        if hit is not None and isinstance(hit[0], str):
+            _dbg_print(f"[LLM-CACHE] hit {cache_key[:12]} model={model}")
+            return hit[0], None
+
+    _bump_llm_call()
+    with _LLM_INFLIGHT:
+        try:
+            resp = _chat_create(
+                client,
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                timeout=timeout_s,
+                **_sampling_kwargs(model, max_tokens),
+            )
+        except TypeError:
+            resp = _chat_create(
+                client,
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+            )
 
     usage = getattr(resp, "usage", None)
 
@@ -847,66 +1729,136 @@ def _call_text(
     # DEBUG: show raw model output
     _log_llm_output(kind="text", model=model, text=txt)
 
-    return txt, usage
+    # an empty reply is a failure the caller replaces with a placeholder; don't pin it
+    if cache is not None and txt:
+        cache.put(cache_key, txt, _usage_to_dict(usage))
 
+    return txt, usage
 
 
 # -----------------------------
-# MAP step: results mini summaries
+# Helpers: OpenAI Batch API (batch_mode)
 # -----------------------------
-def _generate_result_mini_summary(
+# Offline runs can submit a fan-out stage as one Batch API job (half price, up to
+# 24 h turnaround). Replies are parked here by request key and picked up by the
+# regular _call_json_schema calls, so retries/repairs/fallbacks stay unchanged;
+# anything the job did not answer simply goes out as a normal call.
+_BATCH_REPLIES: Dict[str, Tuple[Any, Dict[str, Any]]] = {}
+_BATCH_REPLIES_LOCK = threading.Lock()
+_BATCH_POLL_S = float(os.getenv("SUMMARY_BATCH_POLL_S", "30"))
+_BATCH_TERMINAL = {"completed", "failed", "expired", "cancelled"}
+
+
+def _take_batch_reply(key: str) -> Optional[Tuple[Any, Dict[str, Any]]]:
+    with _BATCH_REPLIES_LOCK:
+        return _BATCH_REPLIES.pop(key, None)
+
+
+def _drop_batch_replies(keys: Sequence[str]) -> None:
+    with _BATCH_REPLIES_LOCK:
+        for key in keys:
+            _BATCH_REPLIES.pop(key, None)
+
+
+def _call_json_schema_batched(
     client,
     *,
     model: str,
-    language: str,
-    section_title: str,
-    section_text: str,
-) -> Tuple[Dict[str, str], Any]:
+    requests: Sequence[Dict[str, Any]],
+) -> List[str]:
     """
-    MAP step for one Results subsection.
-    - GPT-5.x: JSON-only via _call_json_schema
-    - others: text-only via _call_text
+    Submit JSON calls (dicts of _call_json_schema kwargs: prompt, payload_obj,
+    schema, instructions, max_tokens) as ONE Batch API job, wait for it and park the parsed
+    replies for _call_json_schema. Returns the request keys (for _drop_batch_replies).
+    Nothing is counted against the call limits here; see _call_json_schema.
     """
-    lang = _lang_label(language)
+    if not requests:
+        return []
 
-    required_refs = extract_non_supp_figure_refs(section_text)
-    refs_clause = ""
-    if required_refs:
-        refs_clause = (
-            "\nFIGURE REFS (mandatory if present in section_text):\n"
-            + "- Include these NON-supplementary refs verbatim: "
-            + "; ".join(sorted(set(required_refs)))
-            + "\n- Do NOT include supplementary refs (Fig. S..., Supplementary Fig...).\n"
+    strict = _model_supports_schema(model) and model not in _STRICT_SCHEMA_REJECTED
+    keys: List[str] = []
+    schemas: List[Dict[str, Any]] = []
+    lines: List[str] = []
+    for i, req in enumerate(requests):
+        messages = _json_schema_messages(
+            prompt=req["prompt"],
+            payload_obj=req["payload_obj"],
+            instructions=req.get("instructions", ""),
         )
+        keys.append(_request_key(model=model, messages=messages, schema=req["schema"]))
+        schemas.append(req["schema"])
+        body = {
+            "model": model,
+            "messages": messages,
+            "response_format": _response_format(req["schema"], strict=strict),
+            **_sampling_kwargs(model, req.get("max_tokens")),
+        }
+        lines.append(_json_dumps({"custom_id": str(i), "method": "POST", "url": "/v1/chat/completions", "body": body}))
 
-    # ---------- text-only fallback ----------
-    if not _model_supports_schema(model):
-        prompt_text = f"""
-You write a compact scientific mini-summary in {lang} for ONE Results subsection.
+    batch_file = client.files.create(file=("batch.jsonl", "\n".join(lines).encode("utf-8")), purpose="batch")
+    batch = client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+    )
+    print(f"[LLM-BATCH] submitted {batch.id}: {len(lines)} requests, model={model!r}")
+    while batch.status not in _BATCH_TERMINAL:
+        time.sleep(_BATCH_POLL_S)
+        batch = client.batches.retrieve(batch.id)
+    print(f"[LLM-BATCH] {batch.id} {batch.status}")
+
+    if not getattr(batch, "output_file_id", None):
+        return keys
+
+    parked = 0
+    for line in client.files.content(batch.output_file_id).text.splitlines():
+        if not line.strip():
+            continue
+        try:
+            row = _json_loads(line)
+            i = int(row["custom_id"])
+            resp = row.get("response") or {}
+            if row.get("error") or resp.get("status_code") != 200:
+                continue
+            body = resp.get("body") or {}
+            txt = (body["choices"][0]["message"].get("content") or "").strip()
+            parsed = _parse_json_reply(txt, model=model, schema=schemas[i], strict=strict)
+        except Exception as ex:
+            # unusable line: that request goes out as a regular call later
+            _dbg_print(f"[LLM-BATCH] skipped output line: {type(ex).__name__}: {ex}")
+            continue
+        with _BATCH_REPLIES_LOCK:
+            _BATCH_REPLIES[keys[i]] = (parsed, body.get("usage") or {})
+        parked += 1
 
-SECTION TITLE:
-{section_title}
+    if parked < len(keys):
+        print(f"[LLM-BATCH] {len(keys) - parked} of {len(keys)} requests unanswered; they will run as regular calls")
+    return keys
 
-SECTION TEXT:
-{section_text}
+
+# -----------------------------
+# MAP step: results mini summaries
+# -----------------------------
+_MINI_RESULT_TEXT_PROMPT = """
+You write a compact scientific mini-summary in {lang} for ONE Results subsection.
 
 RULES:
 - 2–5 sentences.
 - Do NOT output placeholders like "—" or "-".
 - Do NOT repeat the title.
 - Do NOT include supplementary figure refs.
-{refs_clause}
 
 Return ONLY the mini-summary text.
+{refs_clause}
+SECTION TITLE:
+{section_title}
+
+SECTION TEXT:
+{section_text}
 """
-        text, usage = _call_text(client, model=model, prompt=prompt_text, timeout_s=60)
-        mini = (text or "").strip()
-        if not mini or mini in {"—", "-", "–"} or len(mini) < 10:
-            mini = "Summary generation failed."
-        return {"section_title": section_title, "mini_summary": mini}, usage
 
-    # ---------- GPT-5.x JSON path ----------
-    prompt = f"""
+
+_MINI_RESULT_PROMPT = """
 You write a compact scientific mini-summary in {lang} for ONE Results subsection.
 
 INPUT JSON contains:
@@ -918,78 +1870,375 @@ HARD RULES:
 - mini_summary must be 2–5 sentences.
 - Do NOT output placeholders like "—" or "-" or empty output.
 - Do NOT include supplementary figure refs.
-{refs_clause}
 
 Return ONLY valid JSON:
 {{"section_title": "...", "mini_summary": "..."}}
 """
-    payload = {"section_title": section_title, "section_text": section_text}
-    out, usage = _call_json_schema(
-        client,
-        model=model,
-        prompt=prompt,
-        payload_obj=payload,
-        schema=MINI_RESULT_SCHEMA,
-    )
 
-    ms = (out.get("mini_summary") or "").strip() if isinstance(out, dict) else ""
-    if not ms or ms in {"—", "-", "–"} or len(ms) < 10:
-        # one retry
-        regen_prompt = f"""
-Your previous mini_summary was empty/placeholder or too short.
 
-Return ONLY valid JSON:
-{{"section_title": "{section_title}", "mini_summary": "..."}}
+def _mini_refs_clause(required_refs: List[str]) -> str:
+    if not required_refs:
+        return ""
+    return (
+        "\nFIGURE REFS (mandatory if present in section_text):\n"
+        + "- Include these NON-supplementary refs verbatim: "
+        + "; ".join(sorted(set(required_refs)))
+        + "\n- Do NOT include supplementary refs (Fig. S..., Supplementary Fig...).\n"
+    )
 
-Rules:
-- 2–5 sentences, based ONLY on section_text.
-- No supplementary refs.
-{refs_clause}
-"""
-        out2, usage2 = _call_json_schema(
-            client,
-            model=model,
-            prompt=regen_prompt,
-            payload_obj=payload,
-            schema=MINI_RESULT_SCHEMA,
-        )
-        out = out2
-        usage = (usage, usage2)
 
-    # Enforce refs if needed
-    if required_refs:
-        ok, missing = _contains_all_refs(out.get("mini_summary", ""), required_refs)
-        if not ok and missing:
-            repair_prompt = f"""
-You missed required NON-supplementary figure references.
+def _mini_result_request(*, lang: str, section_title: str, section_text: str, refs_clause: str) -> Dict[str, Any]:
+    """
+    _call_json_schema kwargs of the first per-section MAP call (JSON models).
+    The payload is serialized here once: the placeholder retry resends it as is.
+    """
+    return {
+        "prompt": _render_prompt(_MINI_RESULT_PROMPT, lang),
+        "instructions": refs_clause,
+        "payload_obj": _json_dumps({"section_title": section_title, "section_text": section_text}),
+        "schema": MINI_RESULT_SCHEMA,
+        "max_tokens": _MINI_MAX_TOKENS,
+    }
 
-Return ONLY valid JSON:
-{{"section_title": "{section_title}", "mini_summary": "..."}}
 
-Include these refs verbatim:
-{"; ".join(missing)}
+def _generate_result_mini_summary(
+    client,
+    *,
+    model: str,
+    language: str,
+    section_title: str,
+    section_text: str,
+    local_ref_repair: bool = True,
+) -> Tuple[Dict[str, str], Any]:
+    """
+    MAP step for one Results subsection.
+    - GPT-5.x: JSON-only via _call_json_schema
+    - others: text-only via _call_text
+    local_ref_repair: append dropped figure refs locally instead of a repair call
+    """
+    lang = _lang_label(language)
 
-No supplementary refs. 2–5 sentences.
-"""
-            repaired, usage3 = _call_json_schema(
+    required_pairs = _extract_fig_ref_pairs(section_text)
+    required_refs = [raw for raw, _ in required_pairs]
+    refs_clause = _mini_refs_clause(required_refs)
+
+    # ---------- text-only fallback ----------
+    if not _model_supports_schema(model):
+        # static rules first (shared prefix => prompt caching), section-specific parts last
+        prompt_text = _MINI_RESULT_TEXT_PROMPT.format_map(
+            {
+                "lang": lang,
+                "refs_clause": refs_clause,
+                "section_title": section_title,
+                "section_text": section_text,
+            }
+        )
+        text, usage = _call_text(
+            client, model=model, prompt=prompt_text, timeout_s=60, max_tokens=_MINI_MAX_TOKENS
+        )
+        mini = (text or "").strip()
+        if not mini or mini in {"—", "-", "–"} or len(mini) < 10:
+            mini = "Summary generation failed."
+        return {"section_title": section_title, "mini_summary": mini}, usage
+
+    # ---------- GPT-5.x JSON path ----------
+    request = _mini_result_request(
+        lang=lang, section_title=section_title, section_text=section_text, refs_clause=refs_clause
+    )
+    prompt, payload = request["prompt"], request["payload_obj"]
+
+    def _usable(reply: Any) -> bool:
+        ms = (reply.get("mini_summary") or "").strip() if isinstance(reply, dict) else ""
+        return _mini_is_usable(ms, required_pairs, local_ref_repair=local_ref_repair)
+
+    out, usage = _call_json_schema(client, model=model, accept=_usable, **request)
+
+    ms = (out.get("mini_summary") or "").strip() if isinstance(out, dict) else ""
+    if _is_placeholder_mini(ms):
+        # one retry (same static prompt, the retry note goes with the payload)
+        regen_note = f"""
+Your previous mini_summary was empty/placeholder or too short.
+Write 2–5 sentences, based ONLY on section_text, for section_title "{section_title}".
+{refs_clause}
+"""
+        out2, usage2 = _call_json_schema(
+            client,
+            model=model,
+            prompt=prompt,
+            instructions=regen_note,
+            payload_obj=payload,
+            schema=MINI_RESULT_SCHEMA,
+            max_tokens=_MINI_MAX_TOKENS,
+            accept=_usable,
+        )
+        out = out2
+        usage = (usage, usage2)
+
+    # Enforce refs if needed
+    if required_refs:
+        ok, missing = _contains_all_refs(out.get("mini_summary", ""), required_pairs)
+        if not ok and missing and local_ref_repair:
+            appended = _append_missing_fig_refs(out.get("mini_summary", ""), missing)
+            if _contains_all_refs(appended, required_pairs)[0]:
+                return {"section_title": section_title, "mini_summary": appended}, usage
+        if not ok and missing:
+            repaired, usage3 = _repair_missing_fig_refs(
                 client,
                 model=model,
-                prompt=repair_prompt,
-                payload_obj={
-                    "section_title": section_title,
-                    "mini_summary": out.get("mini_summary", ""),
-                },
-                schema=MINI_RESULT_SCHEMA,
+                section_title=section_title,
+                mini_summary=out.get("mini_summary", ""),
+                missing=missing,
             )
             return repaired, (usage, usage3)
 
     return out, usage
 
 
+def _is_placeholder_mini(ms: str) -> bool:
+    return not ms or ms in {"—", "-", "–"} or len(ms) < 10
+
+
+def _mini_is_usable(ms: str, required_pairs: List[Tuple[str, str]], *, local_ref_repair: bool) -> bool:
+    """True when a mini-summary needs no further call (no regeneration, no LLM ref repair)."""
+    if _is_placeholder_mini(ms):
+        return False
+    ok, missing = _contains_all_refs(ms, required_pairs)
+    if ok or not missing:
+        return True
+    return local_ref_repair and _contains_all_refs(_append_missing_fig_refs(ms, missing), required_pairs)[0]
+
+
+def _append_missing_fig_refs(mini_summary: str, missing: List[str]) -> str:
+    """
+    Local repair: the model usually just drops a ref from an otherwise good
+    mini-summary, so append the missing ones as a parenthetical (no API call).
+    """
+    base = (mini_summary or "").rstrip().rstrip(".")
+    return f"{base} ({', '.join(missing)})."
+
+
+_REPAIR_REFS_PROMPT = """
+You missed required NON-supplementary figure references.
+Rewrite the mini_summary from the input so it includes the listed refs verbatim.
+
+Return ONLY valid JSON:
+{"section_title": "<unchanged section_title>", "mini_summary": "..."}
+
+No supplementary refs. 2–5 sentences.
+"""
+
+
+def _repair_missing_fig_refs(
+    client,
+    *,
+    model: str,
+    section_title: str,
+    mini_summary: str,
+    missing: List[str],
+) -> Tuple[Dict[str, Any], Any]:
+    """
+    Repair call: rewrite a mini-summary so it includes the missing figure refs.
+    """
+    return _call_json_schema(
+        client,
+        model=model,
+        prompt=_REPAIR_REFS_PROMPT,
+        instructions="Include these refs verbatim:\n" + "; ".join(missing),
+        payload_obj={
+            "section_title": section_title,
+            "mini_summary": mini_summary,
+        },
+        schema=MINI_RESULT_SCHEMA,
+        max_tokens=_MINI_MAX_TOKENS,
+    )
+
+
+def _batch_sections(
+    sections: List[Tuple[str, str]],
+    *,
+    max_items: int,
+    max_chars: int,
+) -> List[List[Tuple[str, str]]]:
+    """
+    Greedy, order-preserving grouping of (title, text) sections: at most max_items
+    per group and at most max_chars of section text (an oversized section is alone).
+    """
+    groups: List[List[Tuple[str, str]]] = []
+    cur: List[Tuple[str, str]] = []
+    cur_chars = 0
+    for sec in sections:
+        n = len(sec[1])
+        if cur and (len(cur) >= max_items or cur_chars + n > max_chars):
+            groups.append(cur)
+            cur, cur_chars = [], 0
+        cur.append(sec)
+        cur_chars += n
+    if cur:
+        groups.append(cur)
+    return groups
+
+
+_MINI_RESULTS_BATCH_PROMPT = """
+You write compact scientific mini-summaries in {lang}, one for EACH Results subsection.
+
+INPUT JSON contains:
+- sections: list of {{section_title: str, section_text: str, figure_refs: list[str]}}
+
+HARD RULES:
+- Return exactly one item per input section, in the same order.
+- Preserve each section_title EXACTLY.
+- Each mini_summary must be 2–5 sentences, based ONLY on its own section_text.
+- Include every ref from the section's figure_refs verbatim in its mini_summary.
+- Do NOT output placeholders like "—" or "-" or empty output.
+- Do NOT include supplementary figure refs (Fig. S..., Supplementary Fig...).
+
+Return ONLY valid JSON:
+{{"items": [{{"section_title": "...", "mini_summary": "..."}}, ...]}}
+"""
+
+
+def _mini_batch_request(
+    *,
+    lang: str,
+    sections: List[Tuple[str, str]],
+    required: List[Tuple[Tuple[str, str], ...]],
+) -> Dict[str, Any]:
+    """_call_json_schema kwargs of a batched MAP call (`required`: ref pairs per section)."""
+    # required refs travel with their section, so the instructions stay static per language
+    payload = {
+        "sections": [
+            {
+                "section_title": title,
+                "section_text": text,
+                "figure_refs": sorted({raw for raw, _ in refs}),
+            }
+            for (title, text), refs in zip(sections, required)
+        ]
+    }
+    return {
+        "prompt": _render_prompt(_MINI_RESULTS_BATCH_PROMPT, lang),
+        "payload_obj": payload,
+        "schema": MINI_RESULTS_BATCH_SCHEMA,
+        "max_tokens": _MINI_MAX_TOKENS * len(sections),
+    }
+
+
+def _generate_results_mini_batch(
+    client,
+    *,
+    model: str,
+    language: str,
+    sections: List[Tuple[str, str]],
+    local_ref_repair: bool = True,
+) -> Tuple[List[Dict[str, str]], Any]:
+    """
+    MAP step for SEVERAL Results subsections in ONE call (JSON models only).
+    Amortizes round trip + instruction tokens over the batch.
+    Items that come back missing/placeholder fall back to the per-section path;
+    items missing figure refs get the per-section repair only.
+    Returns mini-summaries in input order and a tuple of usages.
+    """
+    if len(sections) == 1:
+        title, text = sections[0]
+        mini, usage = _generate_result_mini_summary(
+            client,
+            model=model,
+            language=language,
+            section_title=title,
+            section_text=text,
+            local_ref_repair=local_ref_repair,
+        )
+        return [mini], (usage,)
+
+    lang = _lang_label(language)
+
+    required = [_extract_fig_ref_pairs(text) for _, text in sections]
+    titles = [title for title, _ in sections]
+
+    def _batch_texts(reply: Any) -> List[str]:
+        # a re-cased, translated or rewritten title must not cost a per-section fallback call
+        items = reply.get("items") if isinstance(reply, dict) else None
+        pairs = [
+            (str(it.get("section_title") or ""), str(it.get("mini_summary") or "").strip())
+            for it in (items if isinstance(items, list) else [])
+            if isinstance(it, dict)
+        ]
+        return _match_titles(pairs, titles)
+
+    def _usable(reply: Any) -> bool:
+        return all(
+            _mini_is_usable(ms, refs, local_ref_repair=local_ref_repair)
+            for ms, refs in zip(_batch_texts(reply), required)
+        )
+
+    out, usage = _call_json_schema(
+        client,
+        model=model,
+        accept=_usable,
+        **_mini_batch_request(lang=lang, sections=sections, required=required),
+    )
+    batch_texts = _batch_texts(out)
+
+    minis: List[Dict[str, str]] = []
+    usages: List[Any] = [usage]
+    for (title, text), refs, batch_ms in zip(sections, required, batch_texts):
+        ms = batch_ms
+        if _is_placeholder_mini(ms):
+            mini, u = _generate_result_mini_summary(
+                client,
+                model=model,
+                language=language,
+                section_title=title,
+                section_text=text,
+                local_ref_repair=local_ref_repair,
+            )
+            minis.append(mini)
+            usages.append(u)
+            continue
+
+        ok, missing = _contains_all_refs(ms, refs)
+        if not ok and missing and local_ref_repair:
+            appended = _append_missing_fig_refs(ms, missing)
+            if _contains_all_refs(appended, refs)[0]:
+                ms, ok = appended, True
+        if not ok and missing:
+            mini, u = _repair_missing_fig_refs(
+                client, model=model, section_title=title, mini_summary=ms, missing=missing
+            )
+            usages.append(u)
+            # the repair must not rename the section; keep the batch text if it came back empty
+            ms = (mini.get("mini_summary") or "").strip() if isinstance(mini, dict) else ""
+            if _is_placeholder_mini(ms):
+                ms = batch_ms
+
+        minis.append({"section_title": title, "mini_summary": ms})
+
+    return minis, tuple(usages)
+
 
 # -----------------------------
 # Figures narrative (Approach 2)
 # -----------------------------
+_FIGURES_NARRATIVE_PROMPT = """
+Write a coherent Figures narrative in {lang} for a scientific article.
+
+INPUT JSON will contain:
+- chunk_id: integer
+- captions: list of figure captions (main figures only)
+- relevant_results_mini: list of mini-summaries for Results subsections that mention the same figure references
+
+RULES:
+- Use ONLY the provided captions + relevant_results_mini as evidence.
+- Keep figure references as they appear (do not invent new ones).
+- Ignore supplementary figures (Fig. S..., Supplementary Fig...).
+- Produce a narrative that links what each figure shows to the corresponding results claims.
+
+OUTPUT:
+Return ONLY valid JSON following the schema:
+{{"chunk_id": <int>, "narrative": "<text>"}}
+"""
+
+
 def _generate_figures_narrative_chunks(
     client,
     *,
@@ -998,72 +2247,77 @@ def _generate_figures_narrative_chunks(
     figures: List[Dict[str, Any]],
     results_mini: List[Dict[str, str]],
     batch_size: int = 10,
+    max_workers: int = _DEFAULT_MAX_CONCURRENCY,
 ) -> Tuple[List[str], List[Any]]:
     """
     Approach 2:
     - For each captions batch:
       - extract figure refs from captions
       - include ONLY those results mini-summaries that mention these refs
+    - Batches are independent, so their LLM calls run concurrently (order preserved).
     """
+    if not figures:
+        return [], []
+
     lang = _lang_label(language)
 
-    # Precompute: result mini -> refs set
-    mini_with_refs: List[Tuple[Dict[str, str], set[str]]] = []
-    for item in results_mini:
-        refs = extract_non_supp_figure_refs(item.get("mini_summary", ""))
-        mini_with_refs.append((item, set(_normalize_fig_ref(r) for r in refs)))
+    # Precompute: result mini -> refs set (parallel list; the index below only
+    # needs the sets, the mini dicts are fetched on hit)
+    refs_sets: List[frozenset[str]] = [
+        frozenset(n for _, n in _extract_fig_ref_pairs(item.get("mini_summary", "")))
+        for item in results_mini
+    ]
 
-    chunks: List[str] = []
-    usages: List[Any] = []
+    # Inverted index: normalized ref -> indices of mini-summaries mentioning it
+    ref_to_minis: Dict[str, List[int]] = {}
+    for idx, refs_norm in enumerate(refs_sets):
+        for r in refs_norm:
+            ref_to_minis.setdefault(r, []).append(idx)
+
+    prompt = _render_prompt(_FIGURES_NARRATIVE_PROMPT, lang)
 
-    # Split figures into batches
-    for i in range(0, len(figures), batch_size):
-        batch = figures[i : i + batch_size]
+    # Per figure, once: (caption, normalized refs); aligned with `figures`
+    per_fig: List[Tuple[str, frozenset[str]]] = []
+    for f in figures:
+        cap = (f.get("caption") or "").strip()
+        refs = frozenset(n for _, n in _extract_fig_ref_pairs(cap)) if cap else frozenset()
+        per_fig.append((cap, refs))
 
+    # Build all batch payloads first (CPU only), then dispatch the calls
+    payloads: List[Dict[str, Any]] = []
+    for i in range(0, len(per_fig), batch_size):
         # Build captions block and refs set
         captions_lines: List[str] = []
         batch_refs_norm: set[str] = set()
 
-        for f in batch:
-            cap = (f.get("caption") or "").strip()
+        for cap, refs in per_fig[i : i + batch_size]:
             if not cap:
                 continue
             captions_lines.append(cap)
-            for r in extract_non_supp_figure_refs(cap):
-                batch_refs_norm.add(_normalize_fig_ref(r))
-
-        # Select relevant mini-summaries
-        relevant: List[Dict[str, str]] = []
-        if batch_refs_norm:
-            for item, refs_norm in mini_with_refs:
-                if refs_norm & batch_refs_norm:
-                    relevant.append(item)
+            batch_refs_norm.update(refs)
+        if not captions_lines:
+            continue  # nothing to narrate; don't pay for an empty chunk
 
-        prompt = f"""
-Write a coherent Figures narrative in {lang} for a scientific article.
-
-INPUT JSON will contain:
-- chunk_id: integer
-- captions: list of figure captions (main figures only)
-- relevant_results_mini: list of mini-summaries for Results subsections that mention the same figure references
+        # Select relevant mini-summaries (input order preserved)
+        relevant_idx: set[int] = set()
+        for r in batch_refs_norm:
+            relevant_idx.update(ref_to_minis.get(r, ()))
+        relevant = [results_mini[j] for j in sorted(relevant_idx)]
 
-RULES:
-- Use ONLY the provided captions + relevant_results_mini as evidence.
-- Keep figure references as they appear (do not invent new ones).
-- Ignore supplementary figures (Fig. S..., Supplementary Fig...).
-- Produce a narrative that links what each figure shows to the corresponding results claims.
+        payloads.append(
+            {
+                "chunk_id": (i // batch_size) + 1,
+                "captions": captions_lines,
+                "relevant_results_mini": relevant,
+            }
+        )
 
-OUTPUT:
-Return ONLY valid JSON following the schema:
-{{"chunk_id": <int>, "narrative": "<text>"}}
-"""
+    def _call_batch(payload: Dict[str, Any]) -> Tuple[Dict[str, Any], Any]:
+        return _call_json_schema(client, model=model, prompt=prompt, payload_obj=payload, schema=FIGURES_CHUNK_SCHEMA)
 
-        payload = {
-            "chunk_id": (i // batch_size) + 1,
-            "captions": captions_lines,
-            "relevant_results_mini": relevant,
-        }
-        out, usage = _call_json_schema(client, model=model, prompt=prompt, payload_obj=payload, schema=FIGURES_CHUNK_SCHEMA)
+    chunks: List[str] = []
+    usages: List[Any] = []
+    for out, usage in _map_concurrently(_call_batch, payloads, max_workers=max_workers):
         chunks.append(out.get("narrative", "").strip())
         usages.append(usage)
 
@@ -1073,32 +2327,13 @@ Return ONLY valid JSON following the schema:
 # -----------------------------
 # REDUCE step: final summary
 # -----------------------------
-def _generate_final_summary_reduce(
-    client,
-    *,
-    model: str,
-    language: str,
-    article_json: Dict[str, Any],
-    results_mini: List[Dict[str, str]],
-    figures_narrative: str,
-) -> Tuple[Dict[str, Any], Any]:
-    lang = _lang_label(language)
-
-    # Keep strict title list and order
-    def _get_res_title(item: dict) -> str:
-        return (item.get("title") or item.get("section_title") or "").strip()
-    results_titles = [_get_res_title(r) for r in article_json.get("results", []) if _get_res_title(r)]
-    # user asked: if empty -> error earlier, but keep safe guard
-    if not results_titles:
-        raise ValueError("No Results subsections found in input JSON.")
-
-    prompt = f"""
+_FINAL_REDUCE_PROMPT = """
 Generate a structured scientific summary in {lang}.
 
 You are given:
 - The article JSON (Introduction/Methods/Results/Discussion/Figures captions).
 - Pre-generated mini-summaries for EACH Results subsection (1:1).
-- A figures narrative assembled from captions + relevant results mini-summaries.
+- Optionally, a figures narrative assembled from captions + relevant results mini-summaries.
 
 IMPORTANT RULES:
 - You MUST preserve Results subsection titles exactly as provided by the parser.
@@ -1120,6 +2355,29 @@ OUTPUT:
 - Return ONLY valid JSON following the provided schema (no extra text).
 """
 
+
+def _generate_final_summary_reduce(
+    client,
+    *,
+    model: str,
+    language: str,
+    article_json: Dict[str, Any],
+    results_mini: List[Dict[str, str]],
+    figures_narrative: str,
+    results_titles: Optional[Sequence[str]] = None,
+) -> Tuple[Dict[str, Any], Any]:
+    lang = _lang_label(language)
+
+    # Keep strict title list and order
+    if results_titles is None:
+        results_titles = _get_results_titles_from_input(article_json)
+    results_titles = list(results_titles)
+    # user asked: if empty -> error earlier, but keep safe guard
+    if not results_titles:
+        raise ValueError("No Results subsections found in input JSON.")
+
+    prompt = _render_prompt(_FINAL_REDUCE_PROMPT, lang)
+
     compact_article = {
     "title": article_json.get("title", ""),
     "year": article_json.get("year", ""),
@@ -1131,13 +2389,249 @@ OUTPUT:
         "article": compact_article,
         "results_titles": results_titles,
         "results_mini": results_mini,
-        "figures_narrative": '',
     }
+    # narrative stage is currently disabled upstream; don't bill an empty field
+    if figures_narrative:
+        payload["figures_narrative"] = figures_narrative
 
     out, usage = _call_json_schema(client, model=model, prompt=prompt, payload_obj=payload, schema=SUMMARY_SCHEMA)
     return out, usage
 
 
+def _exceeds_char_budget(obj: Any, budget: int) -> bool:
+    """
+    True once len(json.dumps(obj, ensure_ascii=False)) would pass `budget`
+    (quotes, escapes, separators and brackets included). Stops walking as soon
+    as the answer is known, so huge articles cost O(budget) rather than
+    O(document).
+    """
+    total = 0
+    stack = [obj]
+    while stack:
+        cur = stack.pop()
+        if isinstance(cur, str):
+            total += len(json.encoder.encode_basestring(cur))
+        elif isinstance(cur, dict):
+            # {}, '"key": ' per item, ', ' between items
+            total += 2 + 2 * max(len(cur) - 1, 0)
+            for k, v in cur.items():
+                total += len(json.encoder.encode_basestring(str(k))) + 2
+                stack.append(v)
+        elif isinstance(cur, (list, tuple)):
+            total += 2 + 2 * max(len(cur) - 1, 0)
+            stack.extend(cur)
+        else:
+            total += len(json.dumps(cur))
+        if total > budget:
+            return True
+    return False
+
+
+_SINGLE_SHOT_PROMPT = """
+Generate a structured scientific summary in {lang}.
+
+You are given a scientific article already parsed into a structured JSON object.
+
+IMPORTANT:
+- The article JSON already contains a list of Results subsections.
+- Each Results subsection has an original title provided by the parser.
+- You MUST preserve these titles exactly.
+- You MUST generate exactly one mini-summary for EACH Results subsection.
+- You MUST NOT invent, merge, split, rename, or omit any Results subsections.
+
+STRICT PROCEDURE (mandatory):
+1. First, read the input JSON and extract the ordered list of Results subsection titles.
+2. Use this list as the ONLY allowed Results sections.
+3. Generate the Results summary strictly following this list, one-to-one and in the same order.
+
+VALIDATION RULES:
+- The number of Results summaries in the output MUST equal the number of Results subsections in the input.
+- Every output Results section_title MUST exactly match one input Results title.
+
+FIGURE REFERENCES:
+- Preserve NON-supplementary figure references in Results/Figures narrative.
+- Ignore supplementary references (Fig. S..., Supplementary Fig...).
+
+OUTPUT FORMAT:
+- Return ONLY valid JSON.
+- The JSON MUST strictly follow the provided schema.
+- Do NOT include any explanatory text outside the JSON.
+"""
+
+
+def _single_shot_article(article_json: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Article as sent to the single-shot call: Methods is dropped, the summary
+    schema has no field for it and it is often the longest section.
+    """
+    return {k: v for k, v in article_json.items() if k != "methods"}
+
+
+# Introduction/Discussion are summarized from the article text (map-reduce)
+_INTRO_DISC_KEYS = ("introduction", "discussion")
+_INTRO_DISC_RATIO = 0.30
+
+
+def _section_summary_task(
+    client,
+    *,
+    model: str,
+    language: str,
+    article_json: Dict[str, Any],
+    key: str,
+    max_workers: int,
+) -> Callable[[], tuple[str, dict]]:
+    """Zero-arg task: map-reduce summary of article_json[key] for _run_tasks."""
+    def _task() -> tuple[str, dict]:
+        return _summarize_long_section_map_reduce(
+            client,
+            model=model,
+            language=language,
+            section_name=key.capitalize(),
+            source_text=str(article_json.get(key) or ""),
+            target_ratio=_INTRO_DISC_RATIO,
+            max_workers=max_workers,
+        )
+    return _task
+
+
+def _section_summary_requests(*, language: str, article_json: Dict[str, Any], key: str) -> List[Dict[str, Any]]:
+    """First-round requests of _section_summary_task(key=key), for batch_mode."""
+    return _section_map_requests(
+        language=language,
+        section_name=key.capitalize(),
+        source_text=str(article_json.get(key) or ""),
+        target_ratio=_INTRO_DISC_RATIO,
+    )
+
+
+def _run_tasks(tasks: Sequence[Callable[[], Any]], *, max_workers: int) -> list:
+    """Run independent zero-arg tasks concurrently; results in task order."""
+    return _map_concurrently(lambda task: task(), tasks, max_workers=max_workers)
+
+
+def _results_map_groups(
+    article_json: Dict[str, Any],
+    *,
+    model: str,
+    results_batch_size: int,
+    results_batch_chars: int,
+) -> List[List[Tuple[str, str]]]:
+    """Results subsections as (title, text), grouped into one list per MAP call."""
+    sections: List[Tuple[str, str]] = []
+    for r in article_json.get("results", []):
+        title = (r.get("title") or r.get("section_title") or "").strip()
+        text = (r.get("text") or r.get("section_text") or "").strip()
+        if not title:
+            continue
+        sections.append((title, text))
+
+    # JSON-capable models: pack several subsections per call; others: one call each
+    if _model_supports_schema(model) and results_batch_size > 1:
+        return _batch_sections(sections, max_items=results_batch_size, max_chars=results_batch_chars)
+    return [[sec] for sec in sections]
+
+
+def _results_map_requests(groups: List[List[Tuple[str, str]]], *, language: str) -> List[Dict[str, Any]]:
+    """First call of every Results MAP group (see _map_group), for batch_mode."""
+    lang = _lang_label(language)
+    requests: List[Dict[str, Any]] = []
+    for group in groups:
+        if len(group) > 1:
+            required = [_extract_fig_ref_pairs(text) for _, text in group]
+            requests.append(_mini_batch_request(lang=lang, sections=group, required=required))
+        else:
+            title, text = group[0]
+            refs_clause = _mini_refs_clause([raw for raw, _ in _extract_fig_ref_pairs(text)])
+            requests.append(
+                _mini_result_request(lang=lang, section_title=title, section_text=text, refs_clause=refs_clause)
+            )
+    return requests
+
+
+def _hierarchical_results_and_reduce(
+    client,
+    *,
+    model: str,
+    language: str,
+    article_json: Dict[str, Any],
+    results_titles: List[str],
+    max_concurrency: int,
+    results_batch_size: int,
+    results_batch_chars: int,
+    local_ref_repair: bool,
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Hierarchical critical path: Results MAP (mini-summaries) followed by the
+    final REDUCE. Returns the raw reduce output and the usage of both stages.
+    """
+    usage_total: Dict[str, Any] = {}
+
+    # -------------------------
+    # MAP: results mini-summaries
+    # -------------------------
+    groups = _results_map_groups(
+        article_json,
+        model=model,
+        results_batch_size=results_batch_size,
+        results_batch_chars=results_batch_chars,
+    )
+
+    def _map_group(group: List[Tuple[str, str]]) -> Tuple[List[Dict[str, str]], Any]:
+        if len(group) > 1:
+            return _generate_results_mini_batch(
+                client,
+                model=model,
+                language=language,
+                sections=group,
+                local_ref_repair=local_ref_repair,
+            )
+        title, text = group[0]
+        mini, usage = _generate_result_mini_summary(
+            client,
+            model=model,
+            language=language,
+            section_title=title,
+            section_text=text,
+            local_ref_repair=local_ref_repair,
+        )
+        return [mini], usage
+
+    # Groups are independent: run their calls concurrently, keep input order
+    results_mini: List[Dict[str, str]] = []
+    for minis, usage in _map_concurrently(_map_group, groups, max_workers=max_concurrency):
+        # usage may be a tuple of usages after retries/repairs/batching
+        usage_total = _merge_usage(usage_total, usage)
+        for mini in minis:
+            results_mini.append(
+                {"section_title": mini["section_title"], "mini_summary": mini["mini_summary"]}
+            )
+
+    # Hard guard: 1:1 titles
+    got_titles = [x["section_title"] for x in results_mini]
+    if got_titles != results_titles:
+        raise RuntimeError(
+            "Internal error: Results mini-summaries titles/order mismatch.\n"
+            f"Expected: {results_titles}\nGot: {got_titles}"
+        )
+
+    # MAP: figures narrative chunks (Approach 2) is disabled; reduce gets none
+    # -------------------------
+    # REDUCE: final structured summary
+    # -------------------------
+    final, usage = _generate_final_summary_reduce(
+        client,
+        model=model,
+        language=language,
+        article_json=article_json,
+        results_mini=results_mini,
+        figures_narrative="",
+        results_titles=results_titles,
+    )
+    usage_total = _merge_usage(usage_total, usage)
+    return final, usage_total
+
+
 # -----------------------------
 # Public API: Variant A (auto)
 # -----------------------------
@@ -1150,29 +2644,44 @@ def generate_summary(
     auto_threshold_chars: int = 60000,
     figures_batch_size: int = 10,
     header_defaults: Optional[Mapping[str, Any]] = None,
+    max_concurrency: int = _DEFAULT_MAX_CONCURRENCY,
+    results_batch_size: int = 4,
+    results_batch_chars: int = 24000,
+    local_ref_repair: bool = True,
+    batch_mode: bool = False,
 ) -> tuple[dict, dict]:
     """
     strategy:
       - "auto": single_shot if input small else hierarchical
       - "single_shot": old behavior (one request)
       - "hierarchical": map-reduce
+    max_concurrency: max parallel LLM calls in the MAP steps (1 = sequential)
+    results_batch_size: Results subsections per MAP call for JSON models (1 = one call each)
+    results_batch_chars: section-text budget per batched MAP call (a longer section goes alone)
+    local_ref_repair: fix mini-summaries that dropped figure refs locally (False = repair via LLM)
+    batch_mode: offline runs only -- send the first round of the hierarchical MAP steps
+      (Results mini-summaries, Introduction/Discussion chunks) through the OpenAI Batch API
+      as one job (half price, may take hours); reduces, repairs and retries stay realtime
     """
     client = get_openai_client()
     # SAFETY: hard cap on number of LLM calls per run
     # Prevents runaway costs if something goes wrong upstream.
     MAX_LLM_CALLS = 25
     llm_calls = 0
+    llm_calls_lock = threading.Lock()  # MAP step calls come from worker threads
 
     def _bump_calls():
         nonlocal llm_calls
-        llm_calls += 1
-        if llm_calls > MAX_LLM_CALLS:
+        with llm_calls_lock:
+            llm_calls += 1
+            n = llm_calls
+        if n > MAX_LLM_CALLS:
             raise RuntimeError(
                 f"Safety stop: exceeded MAX_LLM_CALLS={MAX_LLM_CALLS}. "
                 "Generation aborted to prevent runaway costs."
             )
 
-    _set_llm_call_limiter(_bump_calls)
+    limiter_token = _set_llm_call_limiter(_bump_calls)
     try:
         usage_total: Dict[str, Any] = {}
 
@@ -1190,88 +2699,90 @@ def generate_summary(
             if not _model_supports_schema(model):
                 strat = "hierarchical"
             else:
-                approx_size = len(json.dumps(article_json, ensure_ascii=False))
-                strat = "single_shot" if approx_size < auto_threshold_chars else "hierarchical"
+                # size check only; the article is serialized just if single_shot is picked.
+                # Measured on the whole input (Methods included), so trimming the
+                # single-shot payload does not change which articles go single_shot.
+                too_big = _exceeds_char_budget(article_json, auto_threshold_chars)
+                strat = "hierarchical" if too_big else "single_shot"
 
         if strat == "single_shot":
             # Keep existing single-shot prompt but make language consistent label
             lang = _lang_label(language)
-            prompt = f"""
-Generate a structured scientific summary in {lang}.
+            prompt = _render_prompt(_SINGLE_SHOT_PROMPT, lang)
+            article_text = _json_dumps(_single_shot_article(article_json))
 
-You are given a scientific article already parsed into a structured JSON object.
-
-IMPORTANT:
-- The article JSON already contains a list of Results subsections.
-- Each Results subsection has an original title provided by the parser.
-- You MUST preserve these titles exactly.
-- You MUST generate exactly one mini-summary for EACH Results subsection.
-- You MUST NOT invent, merge, split, rename, or omit any Results subsections.
-
-STRICT PROCEDURE (mandatory):
-1. First, read the input JSON and extract the ordered list of Results subsection titles.
-2. Use this list as the ONLY allowed Results sections.
-3. Generate the Results summary strictly following this list, one-to-one and in the same order.
-
-VALIDATION RULES:
-- The number of Results summaries in the output MUST equal the number of Results subsections in the input.
-- Every output Results section_title MUST exactly match one input Results title.
-
-FIGURE REFERENCES:
-- Preserve NON-supplementary figure references in Results/Figures narrative.
-- Ignore supplementary references (Fig. S..., Supplementary Fig...).
-
-OUTPUT FORMAT:
-- Return ONLY valid JSON.
-- The JSON MUST strictly follow the provided schema.
-- Do NOT include any explanatory text outside the JSON.
-"""
-            out, usage = _call_json_schema(client, model=model, prompt=prompt, payload_obj=article_json, schema=SUMMARY_SCHEMA)
-            usage_total = _merge_usage(usage_total, usage)
-
-            out = _normalize_summary_output(
-                article_json,
-                out,
-                model=model,
-                language=language,
-                header_defaults=header_defaults,
-            )
-
-            # --- Introduction/Discussion: map-reduce like Results (target 25–33%) ---
-
-            # If the reduce step already produced non-empty intro/discussion, keep them.
-            # Otherwise, fall back to map-reduce.
-            if not final.get("introduction", "").strip():
-                src_intro = str(article_json.get("introduction") or "")
-                intro_txt, u_intro = _summarize_long_section_map_reduce(
+            def _section_task(k: str) -> Callable[[], tuple[str, dict]]:
+                return _section_summary_task(
                     client,
                     model=model,
                     language=language,
-                    section_name="Introduction",
-                    source_text=src_intro,
-                    target_ratio=0.30,
+                    article_json=article_json,
+                    key=k,
+                    max_workers=max_concurrency,
                 )
-                usage_total = _merge_usage(usage_total, u_intro)
-                if intro_txt:
-                    final["introduction"] = intro_txt
 
-            if not final.get("discussion", "").strip():
-                src_disc = str(article_json.get("discussion") or "")
-                disc_txt, u_disc = _summarize_long_section_map_reduce(
+            # An Introduction/Discussion the streamed reply leaves empty gets its
+            # map-reduce started right away, overlapping the rest of the reply
+            section_pool = ThreadPoolExecutor(max_workers=len(_INTRO_DISC_KEYS)) if max_concurrency > 1 else None
+            early: Dict[str, Future] = {}
+            early_cancelled = threading.Event()
+
+            def _early_section_task(k: str) -> Callable[[], tuple[str, dict]]:
+                task = _section_task(k)
+
+                def _bump_unless_cancelled() -> None:
+                    if early_cancelled.is_set():
+                        raise RuntimeError(f"{k.capitalize()} map-reduce cancelled: the single_shot call failed.")
+                    _bump_calls()
+
+                def _run() -> tuple[str, dict]:
+                    # checked before every paid call of the task, worker threads included
+                    token = _set_llm_call_limiter(_bump_unless_cancelled)
+                    try:
+                        return task()
+                    finally:
+                        _clear_llm_call_limiter(token)
+                return _run
+
+            def _start_section(k: str) -> None:
+                if section_pool is not None and k in _INTRO_DISC_KEYS and k not in early:
+                    early[k] = _submit(section_pool, _early_section_task(k))
+
+            try:
+                out, usage = _call_json_schema(
                     client,
                     model=model,
+                    prompt=prompt,
+                    payload_obj=article_text,
+                    schema=SUMMARY_SCHEMA,
+                    on_empty_field=_start_section,
+                )
+                usage_total = _merge_usage(usage_total, usage)
+
+                out = _normalize_summary_output(
+                    article_json,
+                    out,
+                    model=model,
                     language=language,
-                    section_name="Discussion",
-                    source_text=src_disc,
-                    target_ratio=0.30,
+                    header_defaults=header_defaults,
+                    results_titles=results_titles,
                 )
-                usage_total = _merge_usage(usage_total, u_disc)
-                if disc_txt:
-                    final["discussion"] = disc_txt
 
-            usage_total = _merge_usage(usage_total, u_disc)
-            if disc_txt:
-                out["discussion"] = disc_txt
+                # --- Introduction/Discussion: map-reduce like Results (target 25–33%) ---
+                # Keep what the single-shot reply produced; fill only the empty ones (concurrently).
+                keys = [k for k in _INTRO_DISC_KEYS if not out.get(k)]
+                tasks = [early[k].result if k in early else _section_task(k) for k in keys]
+                for k, (txt, u) in zip(keys, _run_tasks(tasks, max_workers=max_concurrency)):
+                    usage_total = _merge_usage(usage_total, u)
+                    if txt:
+                        out[k] = txt
+            except BaseException:
+                # early map-reduces stop before their next paid call; not waited for
+                early_cancelled.set()
+                raise
+            finally:
+                if section_pool is not None:
+                    section_pool.shutdown(wait=not early_cancelled.is_set(), cancel_futures=True)
 
             # --- Ensure key_points are not empty ---
             kp, u_kp = _ensure_key_points(
@@ -1289,58 +2800,60 @@ OUTPUT FORMAT:
         if strat != "hierarchical":
             raise ValueError(f"Unknown strategy: {strategy!r}")
 
-        # -------------------------
-        # MAP: results mini-summaries
-        # -------------------------
-        results_mini: List[Dict[str, str]] = []
-        for r in article_json.get("results", []):
-            title = (r.get("title") or r.get("section_title") or "").strip()
-            text = (r.get("text") or r.get("section_text") or "").strip()
-            if not title:
-                continue
-
-            mini, usage = _generate_result_mini_summary(
+        # Introduction/Discussion map-reduce (target 25–33%) reads article_json only:
+        # start it now so it overlaps the Results MAP and the final reduce
+        section_tasks = [
+            _section_summary_task(
                 client,
                 model=model,
                 language=language,
-                section_title=title,
-                section_text=text,
-            )
-            # usage may be tuple (usage1, usage2) after repair
-            if isinstance(usage, tuple):
-                for u in usage:
-                    usage_total = _merge_usage(usage_total, u)
-            else:
-                usage_total = _merge_usage(usage_total, usage)
-
-            results_mini.append(
-                {"section_title": mini["section_title"], "mini_summary": mini["mini_summary"]}
+                article_json=article_json,
+                key=k,
+                max_workers=max_concurrency,
             )
-
-        # Hard guard: 1:1 titles
-        got_titles = [x["section_title"] for x in results_mini]
-        if got_titles != results_titles:
-            raise RuntimeError(
-                "Internal error: Results mini-summaries titles/order mismatch.\n"
-                f"Expected: {results_titles}\nGot: {got_titles}"
+            for k in _INTRO_DISC_KEYS
+        ]
+        # batch_mode: the first round of every MAP call (Results groups, Introduction
+        # and Discussion chunks) goes out as ONE Batch API job before anything else
+        batch_keys: List[str] = []
+        section_pool = None
+        try:
+            if batch_mode and _model_supports_schema(model):
+                groups = _results_map_groups(
+                    article_json,
+                    model=model,
+                    results_batch_size=results_batch_size,
+                    results_batch_chars=results_batch_chars,
+                )
+                requests = _results_map_requests(groups, language=language)
+                for k in _INTRO_DISC_KEYS:
+                    requests.extend(_section_summary_requests(language=language, article_json=article_json, key=k))
+                batch_keys = _call_json_schema_batched(client, model=model, requests=requests)
+
+            if max_concurrency > 1:
+                section_pool = ThreadPoolExecutor(max_workers=len(section_tasks))
+            if section_pool is not None:
+                section_futures = [_submit(section_pool, task) for task in section_tasks]
+            final, usage = _hierarchical_results_and_reduce(
+                client,
+                model=model,
+                language=language,
+                article_json=article_json,
+                results_titles=results_titles,
+                max_concurrency=max_concurrency,
+                results_batch_size=results_batch_size,
+                results_batch_chars=results_batch_chars,
+                local_ref_repair=local_ref_repair,
             )
-
-        # -------------------------
-        # MAP: figures narrative chunks (Approach 2)
-        # -------------------------
-        figures = ""
-        # -------------------------
-        # REDUCE: final structured summary
-        # -------------------------
-        final, usage = _generate_final_summary_reduce(
-            client,
-            model=model,
-            language=language,
-            article_json=article_json,
-            results_mini=results_mini,
-            figures_narrative="",
-        )
-        usage_total = _merge_usage(usage_total, usage)
+            usage_total = _merge_usage(usage_total, usage)
+            if section_pool is not None:
+                section_results = [f.result() for f in section_futures]
+            else:
+                section_results = [task() for task in section_tasks]
+        finally:
+            if section_pool is not None:
+                section_pool.shutdown(wait=True, cancel_futures=True)
+            _drop_batch_replies(batch_keys)
 
         final = _normalize_summary_output(
             article_json,
@@ -1348,38 +2861,14 @@ OUTPUT FORMAT:
             model=model,
             language=language,
             header_defaults=header_defaults,
+            results_titles=results_titles,
         )
 
-        # --- Introduction/Discussion: map-reduce like Results (target 25–33%) ---
-        src_intro = str(article_json.get("introduction") or "")
-        src_disc = str(article_json.get("discussion") or "")
-
-        intro_ratio = 0.30
-        disc_ratio = 0.30
-
-        intro_txt, u_intro = _summarize_long_section_map_reduce(
-            client,
-            model=model,
-            language=language,
-            section_name="Introduction",
-            source_text=src_intro,
-            target_ratio=intro_ratio,
-        )
-        usage_total = _merge_usage(usage_total, u_intro)
-        if intro_txt:
-            final["introduction"] = intro_txt
-
-        disc_txt, u_disc = _summarize_long_section_map_reduce(
-            client,
-            model=model,
-            language=language,
-            section_name="Discussion",
-            source_text=src_disc,
-            target_ratio=disc_ratio,
-        )
-        usage_total = _merge_usage(usage_total, u_disc)
-        if disc_txt:
-            final["discussion"] = disc_txt
+        # map-reduce texts win over the reduce's own intro/discussion
+        for k, (txt, u) in zip(_INTRO_DISC_KEYS, section_results):
+            usage_total = _merge_usage(usage_total, u)
+            if txt:
+                final[k] = txt
 
         # --- Ensure key_points are not empty ---
         kp, u_kp = _ensure_key_points(
@@ -1393,6 +2882,7 @@ OUTPUT FORMAT:
 
         return final, usage_total
     finally:
-        _clear_llm_call_limiter()
+        _clear_llm_call_limiter(limiter_token)
+        _extract_fig_ref_pairs_cached.cache_clear()
 
 
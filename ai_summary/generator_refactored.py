@@ -10,7 +10,16 @@ import re
 import time
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+
+try:
+    # optional: orjson (faster debug-log encoding / reply parsing)
+    import orjson
+except ImportError:
+    orjson = None
+
+# first {...} block in a reply that has extra text around the JSON
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", flags=re.DOTALL)
 
 # NOTE: we rely on get_openai_client() wrapper (it already logs + has MAX_CALLS=20)
 # see ai_summary/openai_client.py
@@ -31,7 +40,8 @@ class LLMDebugSession:
     """
     Per-article session:
     - hard cap on LLM calls (<=10)
-    - request/response logging to a technical file
+    - request/response logging to a technical file (kept open; close() or use as
+      a context manager when done)
     - in-memory token usage accounting
     """
     article_id: str
@@ -39,6 +49,7 @@ class LLMDebugSession:
     max_calls: int = 10
     stats: LLMRunStats = field(default_factory=LLMRunStats)
     tech_log_path: Path = field(init=False)
+    _log_file: Optional[TextIO] = field(init=False, default=None, repr=False)
 
     def __post_init__(self) -> None:
         self.out_dir.mkdir(parents=True, exist_ok=True)
@@ -49,9 +60,22 @@ class LLMDebugSession:
     def _append(self, payload: Dict[str, Any]) -> None:
         payload = dict(payload)
         payload["_ts"] = time.strftime("%Y-%m-%d %H:%M:%S")
-        with self.tech_log_path.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(payload, ensure_ascii=False))
-            f.write("\n")
+        if self._log_file is None:
+            # opened on first write, once per session; line-buffered so the log
+            # survives a crash mid-run
+            self._log_file = self.tech_log_path.open("a", encoding="utf-8", buffering=1)
+        self._log_file.write(_json_dumps(payload) + "\n")
+
+    def close(self) -> None:
+        if self._log_file is not None:
+            self._log_file.close()
+            self._log_file = None
+
+    def __enter__(self) -> LLMDebugSession:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
 
     def bump_call(self) -> None:
         self.stats.calls += 1
@@ -77,11 +101,24 @@ class LLMDebugSession:
         self.stats.total_tokens += int(tt)
 
 
+def _json_dumps(obj: Any, *, indent: bool = False) -> str:
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None)
+
+
 def _safe_json_dumps(obj: Any) -> str:
     try:
-        return json.dumps(obj, ensure_ascii=False, indent=2)
+        return _json_dumps(obj, indent=True)
     except Exception:
-        return json.dumps(str(obj), ensure_ascii=False, indent=2)
+        return _json_dumps(str(obj), indent=True)
+
+
+def _json_loads(txt: str) -> Any:
+    if orjson is not None:
+        return orjson.loads(txt)
+    return json.loads(txt)
 
 
 def _extract_chat_text(resp: Any) -> str:
@@ -151,16 +188,16 @@ def llm_chat_json(
 
     # Try direct JSON
     try:
-        return json.loads(raw)
+        return _json_loads(raw)
     except Exception:
         pass
 
     # Try extracting first {...} block
-    m = re.search(r"\{.*\}", raw, flags=re.DOTALL)
+    m = _JSON_OBJECT_RE.search(raw)
     if m:
         candidate = m.group(0)
         try:
-            return json.loads(candidate)
+            return _json_loads(candidate)
         except Exception:
             pass
 
@@ -0,0 +1,122 @@
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+
+# Bump when prompts/normalization change in a way that should invalidate old entries
+PROMPT_VERSION = "1"
+
+# Used when BRAINWORM_LLM_CACHE=1 and no explicit AI_SUMMARY_CACHE_DIR is given
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "brain-worm2" / "llm"
+
+
+# id(schema) -> (schema, canonical text). Schemas are module constants, so each is
+# serialized once per process; keeping the schema itself pins its id.
+_schema_texts: Dict[int, Tuple[Dict[str, Any], str]] = {}
+
+
+def _schema_text(schema: Optional[Dict[str, Any]]) -> str:
+    if schema is None:
+        return "null"
+    entry = _schema_texts.get(id(schema))
+    if entry is None or entry[0] is not schema:
+        entry = (schema, json.dumps(schema, sort_keys=True, ensure_ascii=False))
+        _schema_texts[id(schema)] = entry
+    return entry[1]
+
+
+class JsonSchemaCache:
+    """
+    Content-addressed on-disk cache for structured LLM replies.
+
+    One plain JSON file per request, named by a sha256 over everything that
+    determines the reply (provider, model, prompt version, messages, schema).
+    Re-runs of the same article skip the API entirely.
+    """
+
+    def __init__(self, cache_dir: Path | str):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(
+        *,
+        provider: str,
+        model: str,
+        prompt: str,
+        payload: str,
+        schema: Optional[Dict[str, Any]],
+    ) -> str:
+        parts = [
+            provider,
+            model,
+            PROMPT_VERSION,
+            prompt,
+            payload,
+            _schema_text(schema),
+        ]
+        h = hashlib.sha256()
+        for part in parts:
+            # length-prefixed so ("ab", "c") and ("a", "bc") never collide
+            b = part.encode("utf-8")
+            h.update(len(b).to_bytes(8, "big"))
+            h.update(b)
+        return h.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Tuple[Any, Dict[str, Any]]]:
+        try:
+            with self._path(key).open("r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or "parsed" not in entry:
+            return None
+        return entry["parsed"], entry.get("usage") or {}
+
+    def put(self, key: str, parsed: Any, usage: Dict[str, Any]) -> None:
+        path = self._path(key)
+        entry = {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "parsed": parsed,
+            "usage": usage,
+        }
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # write-then-rename: concurrent MAP calls never see a half-written file
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with tmp.open("w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"[LLM-CACHE] WARNING: failed to write {path}: {type(e).__name__}: {e}")
+
+
+_caches: Dict[str, JsonSchemaCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[JsonSchemaCache]:
+    """
+    Opt-in cache (None when disabled):
+    - AI_SUMMARY_CACHE_DIR=<dir>: cache in that directory
+    - BRAINWORM_LLM_CACHE=1: cache in DEFAULT_CACHE_DIR
+    """
+    cache_dir = os.getenv("AI_SUMMARY_CACHE_DIR", "").strip()
+    if not cache_dir:
+        flag = os.getenv("BRAINWORM_LLM_CACHE", "").strip().lower()
+        if flag not in {"1", "true", "yes", "y", "on"}:
+            return None
+        cache_dir = str(DEFAULT_CACHE_DIR)
+    with _caches_lock:
+        cache = _caches.get(cache_dir)
+        if cache is None:
+            cache = JsonSchemaCache(cache_dir)
+            _caches[cache_dir] = cache
+        return cache
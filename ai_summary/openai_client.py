@@ -1,11 +1,50 @@
+import threading
+import traceback
+
 from openai import OpenAI
 from config.settings import load_settings
-import traceback
+
+
+# Hard cap on paid requests per client, i.e. per summary run
+MAX_CALLS = 20
+
+
+_http_client = None
+_http_client_lock = threading.Lock()
+
+
+def _shared_http_client():
+    """
+    Process-wide pooled HTTP client, so keep-alive connections survive across runs
+    (and across concurrent MAP calls). None on SDKs without DefaultHttpxClient.
+    """
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            _http_client = _build_http_client()
+        return _http_client
+
+
+def _build_http_client():
+    try:
+        import httpx
+        from openai import DefaultHttpxClient
+    except ImportError:
+        return None
+
+    limits = httpx.Limits(max_connections=32, max_keepalive_connections=32)
+    try:
+        return DefaultHttpxClient(http2=True, limits=limits)
+    except ImportError:
+        # http2 needs the optional 'h2' package
+        return DefaultHttpxClient(limits=limits)
 
 
 def get_openai_client() -> OpenAI:
     """
-    OpenAI client with:
+    OpenAI client for ONE run (call once per generated summary) with:
+    - the process-wide HTTP connection pool (see _shared_http_client)
+    - the API key from the current settings (a changed key applies to the next run)
     - hard cap on number of paid requests per client
     - console logs for each request (model + payload size)
     - console logs for EXCEPTIONS (so we can see the real OpenAI error)
@@ -15,18 +54,22 @@ def get_openai_client() -> OpenAI:
     if not api_key:
         raise RuntimeError("OpenAI API key is not configured.")
 
-    MAX_CALLS = 20
-
+    http_client = _shared_http_client()
     try:
-        client = OpenAI(api_key=api_key, timeout=60, max_retries=0)
+        if http_client is not None:
+            client = OpenAI(api_key=api_key, timeout=60, max_retries=0, http_client=http_client)
+        else:
+            client = OpenAI(api_key=api_key, timeout=60, max_retries=0)
     except TypeError:
         client = OpenAI(api_key=api_key)
 
     call_state = {"n": 0}
+    call_lock = threading.Lock()  # MAP calls come from worker threads
 
     def _bump(where: str, model: str | None, payload_chars: int | None = None) -> None:
-        call_state["n"] += 1
-        n = call_state["n"]
+        with call_lock:
+            call_state["n"] += 1
+            n = call_state["n"]
         print(
             f"[LLM] call #{n}/{MAX_CALLS} via {where} | model={model!r}"
             + (f" | payload_chars={payload_chars}" if payload_chars is not None else "")
@@ -101,3 +144,12 @@ def get_openai_client() -> OpenAI:
 
     print(f"[LLM] OpenAI client created. MAX_CALLS={MAX_CALLS}")
     return client
+
+
+def reset_openai_client() -> None:
+    """Drop the shared connection pool (e.g. after network settings changed, or in tests)."""
+    global _http_client
+    with _http_client_lock:
+        http_client, _http_client = _http_client, None
+    if http_client is not None:
+        http_client.close()
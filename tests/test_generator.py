@@ -0,0 +1,519 @@
+import json
+import threading
+from concurrent.futures import Future
+from types import SimpleNamespace
+
+import httpx
+import openai
+import pytest
+
+from ai_summary import generator as g
+
+
+# -----------------------------
+# Figure refs
+# -----------------------------
+@pytest.mark.parametrize(
+    "text",
+    [
+        "Fig. S1",
+        "Figure S2",
+        "Figs. S3-S4",
+        "Supplementary Fig. 2",
+        "FigS3",
+        "FigureS2",
+        "figS1a",
+        "Figs3",
+    ],
+)
+def test_supplementary_refs_are_dropped(text):
+    assert g.extract_non_supp_figure_refs(text) == []
+
+
+@pytest.mark.parametrize(
+    "text, refs",
+    [
+        ("Fig. 1A shows", ["Fig. 1A"]),
+        ("see Figs. 3–4", ["Figs. 3–4"]),
+        ("see Figs 3-5", ["Figs 3-5"]),
+        ("Figure 2b and Fig. S1", ["Figure 2b"]),
+        ("Fig. 1A, then Fig. 1A again", ["Fig. 1A"]),
+    ],
+)
+def test_main_refs_are_kept(text, refs):
+    assert g.extract_non_supp_figure_refs(text) == refs
+
+
+# -----------------------------
+# Fake OpenAI client
+# -----------------------------
+def _fake_reply(kwargs):
+    """A schema-shaped reply for whatever the pipeline asked for."""
+    rf = kwargs.get("response_format") or {}
+    props = (rf.get("json_schema") or {}).get("schema", {}).get("properties", {})
+    content = kwargs["messages"][-1]["content"]
+    try:
+        payload = json.loads(content[content.find("{"):])
+    except ValueError:
+        payload = {}
+    if "results" in props:
+        return {
+            "header": {},
+            "key_points": ["k"],
+            "introduction": "i",
+            "results": [{"section_title": t, "mini_summary": "r"} for t in payload.get("results_titles", [])],
+            "discussion": "d",
+            "figures": {"narrative": "", "items": []},
+            "abbreviations": [],
+        }
+    if "items" in props:
+        return {
+            "items": [
+                {"section_title": s["section_title"], "mini_summary": "Batched mini summary."}
+                for s in payload.get("sections", [])
+            ]
+        }
+    if "section_title" in props:
+        return {"section_title": payload.get("section_title", ""), "mini_summary": "A mini summary sentence."}
+    if "key_points" in props:
+        return {"key_points": ["k"]}
+    if "text" in props:
+        return {"text": "Section summary."}
+    return {"mini_summary": "Chunk mini summary."}
+
+
+class FakeOpenAI:
+    """Chat Completions + Batch API surface used by the generator; no network."""
+
+    def __init__(self):
+        self.calls = []
+        self.errors = []  # raised by the next chat calls, in order
+        self.replies = []  # returned by the next chat calls instead of _fake_reply
+        self.truncate = 0  # next chat calls cut off at the output cap
+        self.batch_status = "completed"
+        self.batch_lines = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+        self.files = SimpleNamespace(create=self._file_create, content=self._file_content)
+        self.batches = SimpleNamespace(create=self._batch_create, retrieve=self._batch_retrieve)
+
+    def _create(self, **kwargs):
+        self.calls.append(kwargs)
+        if self.errors:
+            raise self.errors.pop(0)
+        reply = self.replies.pop(0) if self.replies else _fake_reply(kwargs)
+        content, finish_reason = json.dumps(reply), "stop"
+        if self.truncate:
+            self.truncate -= 1
+            content, finish_reason = content[:10], "length"
+        msg = SimpleNamespace(content=content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=msg, finish_reason=finish_reason)], usage=None)
+
+    def _file_create(self, *, file, purpose):
+        self.batch_lines = file[1].decode("utf-8").splitlines()
+        return SimpleNamespace(id="file-in")
+
+    def _file_content(self, file_id):
+        out = []
+        for line in self.batch_lines:
+            row = json.loads(line)
+            body = {"choices": [{"message": {"content": json.dumps(_fake_reply(row["body"]))}}], "usage": {}}
+            out.append(json.dumps({"custom_id": row["custom_id"], "response": {"status_code": 200, "body": body}}))
+        return SimpleNamespace(text="\n".join(out))
+
+    def _batch_create(self, **kwargs):
+        return SimpleNamespace(id="batch-1", status="validating")
+
+    def _batch_retrieve(self, batch_id):
+        output = "file-out" if self.batch_status == "completed" else None
+        return SimpleNamespace(id=batch_id, status=self.batch_status, output_file_id=output)
+
+
+@pytest.fixture
+def fake_client(monkeypatch):
+    client = FakeOpenAI()
+    monkeypatch.setattr(g, "get_openai_client", lambda: client)
+    monkeypatch.setattr(g, "_STREAM_RESPONSES", False)
+    monkeypatch.setattr(g, "_BATCH_POLL_S", 0)
+    monkeypatch.delenv("AI_SUMMARY_CACHE_DIR", raising=False)
+    monkeypatch.delenv("BRAINWORM_LLM_CACHE", raising=False)
+    return client
+
+
+def _article(n_results):
+    return {
+        "title": "T",
+        "year": "2020",
+        "introduction": "Background sentence for the introduction. " * 10,
+        "discussion": "Interpretation sentence for the discussion. " * 10,
+        "results": [
+            {"section_title": f"R{i}", "section_text": f"Results text number {i}."} for i in range(1, n_results + 1)
+        ],
+    }
+
+
+# -----------------------------
+# Batch API (batch_mode)
+# -----------------------------
+def test_failed_batch_falls_back_to_live_calls_within_budget(fake_client):
+    fake_client.batch_status = "failed"
+    out, _ = g.generate_summary(
+        _article(14),
+        "gpt-5",
+        "EN",
+        strategy="hierarchical",
+        batch_mode=True,
+        results_batch_size=1,
+        max_concurrency=1,
+    )
+
+    assert [r["section_title"] for r in out["results"]] == [f"R{i}" for i in range(1, 15)]
+    # 14 Results + Introduction + Discussion went out as one (failed) job ...
+    assert len(fake_client.batch_lines) == 16
+    # ... and then live, each counted once: 16 + the final reduce
+    assert len(fake_client.calls) == 17
+    assert g._BATCH_REPLIES == {}
+
+
+def test_completed_batch_leaves_only_the_reduce_live(fake_client):
+    out, _ = g.generate_summary(
+        _article(14),
+        "gpt-5",
+        "EN",
+        strategy="hierarchical",
+        batch_mode=True,
+        results_batch_size=1,
+        max_concurrency=1,
+    )
+
+    assert len(fake_client.calls) == 1
+    reduce_input = fake_client.calls[0]["messages"][-1]["content"]
+    assert reduce_input.count("A mini summary sentence.") == 14
+    assert out["introduction"] == out["discussion"] == "Section summary."
+    assert g._BATCH_REPLIES == {}
+
+
+# -----------------------------
+# Results MAP
+# -----------------------------
+def test_batched_minis_match_rewritten_titles_by_position(fake_client):
+    fake_client.replies.append(
+        {
+            "items": [
+                {"section_title": "Клетки растут", "mini_summary": "Первый итог."},
+                {"section_title": "Мыши гибнут", "mini_summary": "Второй итог."},
+            ]
+        }
+    )
+
+    minis, _ = g._generate_results_mini_batch(
+        fake_client,
+        model="gpt-5",
+        language="RU",
+        sections=[("Cells grow", "Text one."), ("Mice die", "Text two.")],
+    )
+
+    assert minis == [
+        {"section_title": "Cells grow", "mini_summary": "Первый итог."},
+        {"section_title": "Mice die", "mini_summary": "Второй итог."},
+    ]
+    assert len(fake_client.calls) == 1
+
+
+def test_match_titles_prefers_titles_then_position():
+    pairs = [(" b ", "B text"), ("renamed", "A text")]
+    assert g._match_titles(pairs, ["B", "A"]) == ["B text", "A text"]
+    # position never hands one section's text to another title
+    assert g._match_titles(pairs, ["A", "B"]) == ["", "B text"]
+    # nor is it used when the counts differ
+    assert g._match_titles(pairs[1:], ["A"]) == ["A text"]
+    assert g._match_titles(pairs[1:], ["A", "B"]) == ["", ""]
+
+
+def test_normalize_matches_rewritten_result_titles_by_position():
+    article = _article(2)
+    reply = {
+        "results": [
+            {"section_title": "Р1 (перевод)", "mini_summary": "Первый."},
+            {"section_title": "r2", "mini_summary": "Второй."},
+        ]
+    }
+
+    out = g._normalize_summary_output(article, reply, model="gpt-5", language="RU")
+
+    assert out["results"] == [
+        {"section_title": "R1", "mini_summary": "Первый."},
+        {"section_title": "R2", "mini_summary": "Второй."},
+    ]
+
+
+def test_rejected_mini_summary_is_not_cached(fake_client, monkeypatch, tmp_path):
+    monkeypatch.setenv("AI_SUMMARY_CACHE_DIR", str(tmp_path))
+    fake_client.replies = [{"section_title": "T", "mini_summary": "—"}]
+
+    def run():
+        return g._generate_result_mini_summary(
+            fake_client, model="gpt-5", language="EN", section_title="T", section_text="Results text."
+        )[0]["mini_summary"]
+
+    assert run() == "A mini summary sentence."  # placeholder, then the retry
+    assert len(fake_client.calls) == 2
+    # the placeholder was not pinned: the first request is asked again, and its good reply is kept
+    assert run() == "A mini summary sentence."
+    assert len(fake_client.calls) == 3
+    assert run() == "A mini summary sentence."
+    assert len(fake_client.calls) == 3
+
+
+# -----------------------------
+# Strict schema fallback
+# -----------------------------
+def _bad_request(**error):
+    response = httpx.Response(400, request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"))
+    return openai.BadRequestError(error.get("message", "bad request"), response=response, body=error)
+
+
+def _mini_call(client):
+    return g._call_json_schema(
+        client,
+        model="gpt-5",
+        prompt="p",
+        payload_obj={"section_title": "T", "section_text": "x"},
+        schema=g.MINI_RESULT_SCHEMA,
+    )
+
+
+def test_schema_rejection_falls_back_to_json_object(fake_client, monkeypatch):
+    monkeypatch.setattr(g, "_STRICT_SCHEMA_REJECTED", set())
+    fake_client.errors.append(
+        _bad_request(message="Invalid schema for response_format 'response'", param="response_format", code=None)
+    )
+
+    out, _ = _mini_call(fake_client)
+
+    assert out
+    assert [c["response_format"]["type"] for c in fake_client.calls] == ["json_schema", "json_object"]
+    assert g._STRICT_SCHEMA_REJECTED == {"gpt-5"}
+
+
+def test_other_bad_request_keeps_strict_mode(fake_client, monkeypatch):
+    monkeypatch.setattr(g, "_STRICT_SCHEMA_REJECTED", set())
+    fake_client.errors.append(
+        _bad_request(message="maximum context length exceeded", param="messages", code="context_length_exceeded")
+    )
+
+    with pytest.raises(openai.BadRequestError):
+        _mini_call(fake_client)
+
+    assert len(fake_client.calls) == 1
+    assert g._STRICT_SCHEMA_REJECTED == set()
+
+
+# -----------------------------
+# Per-run call limiter
+# -----------------------------
+def test_call_limiter_is_per_run_and_reaches_workers():
+    counts = {"a": 0, "b": 0}
+
+    def run_b():
+        token = g._set_llm_call_limiter(lambda: counts.__setitem__("b", counts["b"] + 1))
+        try:
+            g._bump_llm_call()
+        finally:
+            g._clear_llm_call_limiter(token)
+
+    token = g._set_llm_call_limiter(lambda: counts.__setitem__("a", counts["a"] + 1))
+    try:
+        thread = threading.Thread(target=run_b)
+        thread.start()
+        thread.join()
+        g._map_concurrently(lambda _: g._bump_llm_call(), range(3), max_workers=3)
+    finally:
+        g._clear_llm_call_limiter(token)
+
+    assert counts == {"a": 3, "b": 1}
+
+
+# -----------------------------
+# Output caps
+# -----------------------------
+def test_truncated_reply_is_retried_once_with_a_higher_cap(fake_client):
+    fake_client.truncate = 1
+
+    out, _ = g._call_json_schema(
+        fake_client, model="gpt-4.1", prompt="p", payload_obj={"x": 1}, schema=g.SECTION_CHUNK_SCHEMA, max_tokens=100
+    )
+
+    assert out == {"mini_summary": "Chunk mini summary."}
+    assert [c["max_completion_tokens"] for c in fake_client.calls] == [100, 200]
+
+
+def test_section_max_tokens_leaves_room_for_cyrillic():
+    # 3000 chars of Russian at ~1.5 chars/token, plus the JSON around it
+    assert g._section_max_tokens(3000) >= 2000 + 200
+    assert g._section_max_tokens(10) == g._MINI_MAX_TOKENS
+
+
+# -----------------------------
+# In-flight coalescing
+# -----------------------------
+def test_coalesced_followers_get_an_isolated_copy(fake_client, monkeypatch):
+    reply = {"section_title": "T", "mini_summary": "m", "nested": {"source_path": ""}}
+    monkeypatch.setattr(g, "_call_json_schema_live", lambda client, **kwargs: (reply, None))
+    futures = []
+
+    class RecordingFuture(Future):
+        def __init__(self):
+            super().__init__()
+            futures.append(self)
+
+    monkeypatch.setattr(g, "Future", RecordingFuture)
+
+    owner_reply, _ = _mini_call(fake_client)
+    # the owner's caller mutates its reply in place (as _normalize_summary_output does)
+    owner_reply["nested"]["source_path"] = "/owner/only.pdf"
+
+    assert owner_reply is reply
+    # what a follower would copy from is untouched
+    (snapshot, _), = [f.result() for f in futures]
+    assert snapshot["nested"]["source_path"] == ""
+    assert g._INFLIGHT_CALLS == {}
+
+
+def test_follower_calls_live_when_the_owner_fails(fake_client, monkeypatch):
+    failed = Future()
+    failed.set_exception(RuntimeError("Safety stop: exceeded MAX_LLM_CALLS=25."))
+
+    class OwnerInFlight(dict):
+        def get(self, key, default=None):
+            return failed
+
+    monkeypatch.setattr(g, "_INFLIGHT_CALLS", OwnerInFlight())
+
+    out, _ = g._call_json_schema(
+        fake_client, model="gpt-4.1", prompt="p", payload_obj={"x": 1}, schema=g.SECTION_CHUNK_SCHEMA
+    )
+
+    assert out == {"mini_summary": "Chunk mini summary."}
+    assert len(fake_client.calls) == 1
+
+
+# -----------------------------
+# Auto strategy
+# -----------------------------
+def test_char_budget_matches_serialized_size():
+    article = _article(3)
+    article["methods"] = "Протокол. " * 50
+    n = len(json.dumps(article, ensure_ascii=False))
+    assert not g._exceeds_char_budget(article, n)
+    assert g._exceeds_char_budget(article, n - 1)
+
+
+def test_char_budget_counts_escapes():
+    article = _article(2)
+    article["introduction"] = 'abcd\n "q" \\ \x01' * 500
+    n = len(json.dumps(article, ensure_ascii=False))
+    assert n > len(article["introduction"]) + 500 * 8
+    assert not g._exceeds_char_budget(article, n)
+    assert g._exceeds_char_budget(article, n - 1)
+
+
+class _Routed(Exception):
+    pass
+
+
+def test_auto_routing_counts_methods(fake_client, monkeypatch):
+    def hierarchical(*args, **kwargs):
+        raise _Routed()
+
+    monkeypatch.setattr(g, "_hierarchical_results_and_reduce", hierarchical)
+    article = _article(3)
+    without_methods = len(json.dumps(article, ensure_ascii=False))
+    article["methods"] = "m" * 5000
+
+    # small without Methods, too big with them: the whole input decides
+    with pytest.raises(_Routed):
+        g.generate_summary(article, "gpt-5", "EN", strategy="auto", auto_threshold_chars=without_methods + 100)
+
+
+def test_failed_single_shot_cancels_early_sections(fake_client, monkeypatch):
+    release, done = threading.Event(), threading.Event()
+    outcome = []
+
+    def section_task(client, *, key, **kwargs):
+        def _task():
+            try:
+                release.wait(5)
+                g._bump_llm_call()
+                outcome.append("called")
+            except RuntimeError as ex:
+                outcome.append(str(ex))
+            finally:
+                done.set()
+        return _task
+
+    def single_shot(client, *, on_empty_field=None, **kwargs):
+        on_empty_field("introduction")
+        raise _Routed()
+
+    monkeypatch.setattr(g, "_section_summary_task", section_task)
+    monkeypatch.setattr(g, "_call_json_schema", single_shot)
+
+    with pytest.raises(_Routed):
+        g.generate_summary(_article(2), "gpt-5", "EN", strategy="single_shot")
+    # the still-running early task was not waited for
+    assert not done.is_set()
+
+    release.set()
+    assert done.wait(5)
+    assert outcome == ["Introduction map-reduce cancelled: the single_shot call failed."]
+
+
+# -----------------------------
+# Section map-reduce
+# -----------------------------
+def test_repeated_chunks_are_summarized_once(monkeypatch):
+    monkeypatch.setattr(g, "_split_text_into_chunks", lambda text, max_chars: ["A  b.", "C.", "A b. ", "C."])
+
+    direct, chunks = g._section_map_inputs("x" * 500)
+
+    assert direct is None
+    assert chunks == ["A  b.", "C."]
+
+
+def test_chunks_respect_max_chars_and_keep_paragraph_order():
+    paragraphs = [f"Paragraph {i}" + " word" * (i * 2) for i in range(30)]
+    text = "\n\n".join(paragraphs)
+
+    chunks = g._split_text_into_chunks(text, max_chars=400)
+
+    assert len(chunks) > 1
+    assert all(len(ch) <= 400 for ch in chunks)
+    assert "\n\n".join(chunks) == text
+
+
+def test_oversized_paragraph_is_hard_split():
+    text = "a" * 950
+
+    chunks = g._split_text_into_chunks(text, max_chars=400)
+
+    assert [len(ch) for ch in chunks] == [400, 400, 150]
+
+
+# -----------------------------
+# Rate pacing
+# -----------------------------
+def test_token_bucket_waits_for_refill(monkeypatch):
+    clock = [0.0]
+    waits = []
+    monkeypatch.setattr(g.time, "monotonic", lambda: clock[0])
+    bucket = g._TokenBucket(60)  # 1 token per second
+
+    def fake_wait(timeout):
+        waits.append(timeout)
+        clock[0] += timeout
+
+    bucket.cond.wait = fake_wait
+    bucket.acquire(60)
+    bucket.acquire(2)
+
+    assert waits == [pytest.approx(2.0)]
@@ -0,0 +1,74 @@
+import pytest
+
+from ai_summary import llm_cache
+from ai_summary.llm_cache import JsonSchemaCache, get_llm_cache
+
+SCHEMA = {"type": "object", "properties": {"text": {"type": "string"}}}
+
+
+def _key(**overrides):
+    parts = {"provider": "openai", "model": "gpt-5", "prompt": "p", "payload": "{}", "schema": SCHEMA}
+    parts.update(overrides)
+    return JsonSchemaCache.make_key(**parts)
+
+
+def test_round_trip(tmp_path):
+    cache = JsonSchemaCache(tmp_path)
+    key = _key()
+
+    assert cache.get(key) is None
+    cache.put(key, {"text": "привет"}, {"total_tokens": 3})
+
+    assert cache.get(key) == ({"text": "привет"}, {"total_tokens": 3})
+    # a fresh instance over the same directory sees it too
+    assert JsonSchemaCache(tmp_path).get(key) == ({"text": "привет"}, {"total_tokens": 3})
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {"model": "gpt-4.1"},
+        {"prompt": "p2"},
+        {"payload": '{"a": 1}'},
+        {"schema": {"type": "object"}},
+        {"schema": None},
+        # length-prefixed parts: moving a boundary is a different request
+        {"prompt": "p{", "payload": "}"},
+    ],
+)
+def test_key_changes_with_every_input(overrides):
+    assert _key(**overrides) != _key()
+
+
+def test_schema_key_does_not_depend_on_dict_order():
+    reordered = {"properties": SCHEMA["properties"], "type": "object"}
+    assert _key(schema=reordered) == _key()
+
+
+def test_prompt_version_bump_invalidates(tmp_path, monkeypatch):
+    cache = JsonSchemaCache(tmp_path)
+    cache.put(_key(), {"text": "old"}, {})
+
+    monkeypatch.setattr(llm_cache, "PROMPT_VERSION", llm_cache.PROMPT_VERSION + ".next")
+
+    assert cache.get(_key()) is None
+
+
+def test_unreadable_entry_is_a_miss(tmp_path):
+    cache = JsonSchemaCache(tmp_path)
+    key = _key()
+    cache.put(key, {"text": "t"}, {})
+    cache._path(key).write_text("{not json", encoding="utf-8")
+
+    assert cache.get(key) is None
+
+
+def test_cache_is_opt_in(tmp_path, monkeypatch):
+    monkeypatch.delenv("AI_SUMMARY_CACHE_DIR", raising=False)
+    monkeypatch.delenv("BRAINWORM_LLM_CACHE", raising=False)
+    assert get_llm_cache() is None
+
+    monkeypatch.setenv("AI_SUMMARY_CACHE_DIR", str(tmp_path))
+    cache = get_llm_cache()
+    assert cache is not None and cache.cache_dir == tmp_path
+    assert get_llm_cache() is cache
@@ -0,0 +1,40 @@
+from types import SimpleNamespace
+
+import pytest
+
+from ai_summary import openai_client as oc
+
+
+class FakeSDK:
+    def __init__(self, api_key, **kwargs):
+        self.api_key = api_key
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=lambda **kw: "reply"))
+
+
+@pytest.fixture
+def settings(monkeypatch):
+    current = {"openai_api_key": "key-1"}
+    monkeypatch.setattr(oc, "load_settings", lambda: dict(current))
+    monkeypatch.setattr(oc, "OpenAI", FakeSDK)
+    monkeypatch.setattr(oc, "_build_http_client", lambda: None)
+    return current
+
+
+def test_each_run_has_its_own_call_budget(settings):
+    first = oc.get_openai_client()
+    second = oc.get_openai_client()
+
+    for _ in range(oc.MAX_CALLS):
+        first.chat.completions.create(model="m", messages=[])
+
+    # another run is unaffected by the first one's spending ...
+    assert second.chat.completions.create(model="m", messages=[]) == "reply"
+    # ... and the first one still stops at its own cap
+    with pytest.raises(RuntimeError, match="MAX_CALLS"):
+        first.chat.completions.create(model="m", messages=[])
+
+
+def test_changed_api_key_applies_to_the_next_run(settings):
+    assert oc.get_openai_client().api_key == "key-1"
+    settings["openai_api_key"] = "key-2"
+    assert oc.get_openai_client().api_key == "key-2"